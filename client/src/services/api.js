@@ -1,5 +1,13 @@
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// Refer to an uploaded resume by its server-side session id when we have one,
+// falling back to sending the full text
+const resumePayload = (resume) => (
+  resume && typeof resume === 'object' && resume.resume_id
+    ? { resume_id: resume.resume_id }
+    : { resume_content: typeof resume === 'object' ? resume?.content : resume }
+);
+
 class ApiService {
   async uploadResume(file) {
     const formData = new FormData();
@@ -17,14 +25,14 @@ class ApiService {
     return response.json();
   }
 
-  async analyzeResume(resumeContent, jobDescription = '') {
+  async analyzeResume(resume, jobDescription = '') {
     const response = await fetch(`${API_BASE_URL}/analyze`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
       },
       body: JSON.stringify({
-        resume_content: resumeContent,
+        ...resumePayload(resume),
         job_description: jobDescription,
       }),
     });
@@ -36,14 +44,102 @@ class ApiService {
     return response.json();
   }
 
-  async optimizeLinkedIn(resumeContent, currentProfile = {}) {
+  async scoreAts(resume, jobDescription = '') {
+    const response = await fetch(`${API_BASE_URL}/ats-score`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        ...resumePayload(resume),
+        job_description: jobDescription,
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to score resume');
+    }
+
+    return response.json();
+  }
+
+  async analyzeResumeStream(resume, jobDescription = '', onToken = () => {}, onAts = () => {}) {
+    const response = await fetch(`${API_BASE_URL}/analyze/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        ...resumePayload(resume),
+        job_description: jobDescription,
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error('Failed to analyze resume');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Server-Sent Events are separated by a blank line
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        const event = message.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(message.match(/^data: (.*)$/m)?.[1] || '{}');
+
+        if (event === 'ats') {
+          onAts(data);
+        } else if (event === 'token') {
+          onToken(data.content);
+        } else if (event === 'result') {
+          return { status: 'success', analysis: data };
+        } else if (event === 'error') {
+          throw new Error(data.detail || 'Failed to analyze resume');
+        }
+      }
+    }
+
+    throw new Error('Analysis stream ended unexpectedly');
+  }
+
+  async searchResumes(jobDescription, topK = 10, analyzeTop = 0) {
+    const response = await fetch(`${API_BASE_URL}/index/search`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        job_description: jobDescription,
+        top_k: topK,
+        analyze_top: analyzeTop,
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to search resumes');
+    }
+
+    return response.json();
+  }
+
+  async optimizeLinkedIn(resume, currentProfile = {}) {
     const response = await fetch(`${API_BASE_URL}/linkedin`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
       },
       body: JSON.stringify({
-        resume_content: resumeContent,
+        ...resumePayload(resume),
         current_profile: currentProfile,
       }),
     });
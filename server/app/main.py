@@ -1,21 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Match
 import os
+import time
+from typing import List
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import openai
-from .services.resume_parser import ResumeParser
-from .services.ai_analyzer import AIAnalyzer
-from .services.linkedin_optimizer import LinkedInOptimizer
 
-# Load environment variables
+# Load environment variables before the service modules below read them at import time
 load_dotenv()
 
+from .middleware import CompressionMiddleware, ConditionalGetMiddleware
+from .responses import FastJSONResponse, dump_json
+from .services.resume_parser import ParserBusyError, UnsupportedFormatError, UploadTooLargeError
+from .services.container import ServiceContainer
+from .services.openai_client import openai_clients
+from .services.llm_scheduler import PRIORITY_BATCH, llm_priority, llm_scheduler
+from .services.model_router import model_router
+from .services.metrics import HTTP_REQUEST_SECONDS, endpoint_context, metrics, server_timing_header
+from .services.job_queue import FINISHED_STATES, JobQueueFullError
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    app.state.services = services
+    if STARTUP_WARMUP:
+        # Pay for heavy imports and client setup before the first request instead of during it
+        services.warm_up()
+    services.job_queue.register("analyze", run_analysis_job)
+    services.job_queue.register("linkedin", run_linkedin_job)
+    await services.job_queue.start()
+    yield
+    await services.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI-Powered Resume Reviewer",
     description="A smart web application for AI-powered resume analysis and optimization",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -27,10 +52,111 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-resume_parser = ResumeParser()
-ai_analyzer = AIAnalyzer()
-linkedin_optimizer = LinkedInOptimizer()
+# Both sit inside the @app.middleware("http") handlers, which re-chunk response bodies;
+# the ETag is computed before compression so it does not depend on the encoding
+if os.getenv("RESPONSE_ETAGS", "true").lower() == "true":
+    app.add_middleware(ConditionalGetMiddleware)
+if os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+        gzip_level=int(os.getenv("GZIP_LEVEL", "6")),
+        brotli_quality=int(os.getenv("BROTLI_QUALITY", "4"))
+    )
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse single-resume uploads by Content-Length before the body is read"""
+    if request.url.path == "/upload-resume":
+        content_length = request.headers.get("content-length")
+        # Allow some room for the multipart framing around the file
+        if content_length and content_length.isdigit() and int(content_length) > services.resume_parser.max_file_size + 64 * 1024:
+            return FastJSONResponse(
+                status_code=413,
+                content={"detail": f"File exceeds the maximum size of {services.resume_parser.max_file_size} bytes"}
+            )
+    return await call_next(request)
+
+# Adds a Server-Timing header with per-stage durations to each response
+SERVER_TIMING_ENABLED = os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+
+def route_template(request: Request) -> str:
+    """Route path (e.g. /jobs/{job_id}) used as the endpoint label"""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Label downstream metrics with the endpoint and time the request
+    
+    For streaming endpoints this measures time to the first byte.
+    """
+    endpoint = route_template(request)
+    started = time.perf_counter()
+    with endpoint_context(endpoint, collect_timings=SERVER_TIMING_ENABLED):
+        response = await call_next(request)
+        elapsed = time.perf_counter() - started
+        HTTP_REQUEST_SECONDS.observe(
+            elapsed, endpoint=endpoint, method=request.method, status=str(response.status_code)
+        )
+        if SERVER_TIMING_ENABLED:
+            timing = server_timing_header()
+            total = f"total;dur={elapsed * 1000:.1f}"
+            response.headers["Server-Timing"] = f"{timing}, {total}" if timing else total
+    return response
+
+# Services are created on first use (or during startup when STARTUP_WARMUP is on)
+services = ServiceContainer()
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+# Index every upload automatically; the index is shared and /index/search returns resume_ids,
+# so only enable this where all uploaders may see each other's resumes
+INDEX_ON_UPLOAD = os.getenv("RESUME_INDEX_ON_UPLOAD", "false").lower() == "true"
+
+# Background jobs yield LLM capacity to interactive requests
+async def run_analysis_job(payload: dict) -> dict:
+    with llm_priority(PRIORITY_BATCH):
+        return await services.ai_analyzer.analyze_resume(payload["resume_content"], payload.get("job_description", ""))
+
+async def run_linkedin_job(payload: dict) -> dict:
+    with llm_priority(PRIORITY_BATCH):
+        return await services.linkedin_optimizer.optimize_profile(payload["resume_content"], payload.get("current_profile", {}))
+
+metrics.register_stats("parse_cache", lambda: services.resume_parser.cache_stats())
+metrics.register_stats("llm_cache", lambda: services.ai_analyzer.cache.stats())
+metrics.register_stats("resume_sessions", lambda: services.resume_sessions.stats())
+metrics.register_stats("resume_index", lambda: services.resume_index.stats())
+metrics.register_stats("prefetch", lambda: services.prefetcher.stats())
+metrics.register_stats("openai_pool", openai_clients.stats)
+metrics.register_stats("llm_scheduler", llm_scheduler.stats)
+metrics.register_stats("model_router", model_router.stats)
+
+def resolve_resume_content(data: dict) -> str:
+    """Return resume text from a resume_id session, or the inline resume_content"""
+    resume_id = data.get("resume_id")
+    if resume_id:
+        session = services.resume_sessions.get(resume_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Resume session not found or expired")
+        return session["content"]
+    
+    resume_content = data.get("resume_content")
+    if not resume_content:
+        raise HTTPException(status_code=400, detail="Resume content is required")
+    return resume_content
+
+def int_field(data: dict, name: str, default: int) -> int:
+    """Read an integer from a request body, rejecting anything else with a 400"""
+    value = data.get(name, default)
+    try:
+        # bool is an int subclass, and floats would be silently truncated
+        if isinstance(value, (bool, float)):
+            raise ValueError
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"{name} must be an integer")
 
 @app.get("/")
 async def root():
@@ -38,22 +164,39 @@ async def root():
     return {"message": "AI-Powered Resume Reviewer API", "version": "1.0.0"}
 
 @app.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(request: Request, file: UploadFile = File(...)):
     """Upload and parse resume (PDF/DOCX)"""
     try:
         if not file.filename.lower().endswith(('.pdf', '.docx')):
             raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
         
         # Parse the resume
-        content = await resume_parser.parse_resume(file)
+        content = await services.resume_parser.parse_resume(file)
+        resume_id = services.resume_sessions.create(content, file.filename)
+        if INDEX_ON_UPLOAD:
+            services.resume_index.add(resume_id, content, file.filename)
+        # Start the usual next steps speculatively (when PREFETCH_ENABLED)
+        prefetching = services.prefetcher.start(
+            resume_id, content, request.client.host if request.client else None
+        )
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "status": "success",
+            "resume_id": resume_id,
             "filename": file.filename,
             "content": content,
+            "prefetching": prefetching,
             "message": "Resume uploaded and parsed successfully"
         })
     
+    except HTTPException:
+        raise
+    except ParserBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
@@ -61,45 +204,248 @@ async def upload_resume(file: UploadFile = File(...)):
 async def analyze_resume(data: dict):
     """GPT-based resume analysis"""
     try:
-        resume_content = data.get("resume_content")
+        resume_content = resolve_resume_content(data)
         job_description = data.get("job_description", "")
         
-        if not resume_content:
-            raise HTTPException(status_code=400, detail="Resume content is required")
+        # Prefetches run without a job description, so only those requests can use them
+        analysis = None
+        if not job_description:
+            analysis = await services.prefetcher.take(data.get("resume_id"), "analyze")
+        if analysis is None:
+            # Analyze with AI
+            analysis = await services.ai_analyzer.analyze_resume(resume_content, job_description)
         
-        # Analyze with AI
-        analysis = await ai_analyzer.analyze_resume(resume_content, job_description)
-        
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "status": "success",
             "analysis": analysis
         })
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing resume: {str(e)}")
 
+@app.post("/ats-score")
+async def ats_score(data: dict):
+    """Instant local ATS match score, computed without an LLM call"""
+    resume_content = resolve_resume_content(data)
+    job_description = data.get("job_description", "")
+    
+    return FastJSONResponse(content={
+        "status": "success",
+        "ats": services.ai_analyzer.ats_scorer.score(resume_content, job_description)
+    })
+
+@app.post("/analyze/stream")
+async def analyze_resume_stream(data: dict):
+    """GPT-based resume analysis streamed as Server-Sent Events"""
+    resume_content = resolve_resume_content(data)
+    job_description = data.get("job_description", "")
+    
+    async def event_stream():
+        analysis = None
+        if not job_description:
+            analysis = await services.prefetcher.take(data.get("resume_id"), "analyze")
+        if analysis is not None:
+            # Replay the prefetched result in the usual event order
+            messages = [
+                {"event": "ats", "data": analysis["local_ats"]},
+                {"event": "token", "data": {"content": analysis["raw_analysis"]}},
+                {"event": "result", "data": analysis}
+            ]
+            for message in messages:
+                yield f"event: {message['event']}\ndata: {dump_json(message['data'])}\n\n"
+            return
+        
+        async for message in services.ai_analyzer.stream_analysis(resume_content, job_description):
+            yield f"event: {message['event']}\ndata: {dump_json(message['data'])}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/analyze/batch")
+async def analyze_resume_batch(files: List[UploadFile] = File(...), job_description: str = Form("")):
+    """Screen many resumes (PDF/DOCX files or zip archives) against one job description
+    
+    Results stream back as NDJSON, one line per resume in completion order.
+    """
+    uploads = []
+    for file in files:
+        if not file.filename.lower().endswith(('.pdf', '.docx', '.zip')):
+            raise HTTPException(status_code=400, detail=f"Unsupported file: {file.filename}")
+        if file.size is not None and file.size > services.resume_parser.max_file_size:
+            raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the maximum file size")
+        uploads.append((file.filename, file))
+    
+    try:
+        documents = services.batch_analyzer.collect_documents(uploads)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not documents:
+        raise HTTPException(status_code=400, detail="No PDF or DOCX resumes found in the upload")
+    
+    async def ndjson_stream():
+        async for item in services.batch_analyzer.analyze_batch(documents, job_description):
+            yield dump_json(item) + "\n"
+    
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
 @app.post("/linkedin")
 async def optimize_linkedin(data: dict):
     """Optimize LinkedIn profile content"""
     try:
-        resume_content = data.get("resume_content")
+        resume_content = resolve_resume_content(data)
         current_profile = data.get("current_profile", {})
         
-        if not resume_content:
-            raise HTTPException(status_code=400, detail="Resume content is required")
-        
-        # Optimize LinkedIn profile
-        optimized_profile = await linkedin_optimizer.optimize_profile(resume_content, current_profile)
+        optimized_profile = None
+        if not current_profile:
+            optimized_profile = await services.prefetcher.take(data.get("resume_id"), "linkedin")
+        if optimized_profile is None:
+            # Optimize LinkedIn profile
+            optimized_profile = await services.linkedin_optimizer.optimize_profile(resume_content, current_profile)
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "status": "success",
             "optimized_profile": optimized_profile
         })
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error optimizing LinkedIn profile: {str(e)}")
 
+async def enqueue_job(kind: str, payload: dict) -> FastJSONResponse:
+    try:
+        job = await services.job_queue.submit(kind, payload)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return FastJSONResponse(status_code=202, content={"status": "success", "job": job})
+
+@app.post("/jobs/analyze")
+async def submit_analysis_job(data: dict):
+    """Queue a resume analysis and return its job id"""
+    return await enqueue_job("analyze", {
+        "resume_content": resolve_resume_content(data),
+        "job_description": data.get("job_description", "")
+    })
+
+@app.post("/jobs/linkedin")
+async def submit_linkedin_job(data: dict):
+    """Queue a LinkedIn profile optimization and return its job id"""
+    return await enqueue_job("linkedin", {
+        "resume_content": resolve_resume_content(data),
+        "current_profile": data.get("current_profile", {})
+    })
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Job status and result; wait long-polls up to 60 seconds for completion"""
+    if wait > 0:
+        job = await services.job_queue.wait(job_id, timeout=min(wait, 60))
+    else:
+        job = services.job_queue.get(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "success", "job": job}
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-Sent Events stream that emits the job's status until it finishes"""
+    job = services.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        current = job
+        yield f"event: status\ndata: {dump_json(current)}\n\n"
+        while current is not None and current["status"] not in FINISHED_STATES:
+            # Each wait doubles as a keep-alive so proxies do not close the stream
+            current = await services.job_queue.wait(job_id, timeout=15)
+            if current is not None:
+                yield f"event: status\ndata: {dump_json(current)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/resume/{resume_id}")
+async def delete_resume(resume_id: str):
+    """Discard a stored resume session"""
+    services.resume_sessions.delete(resume_id)
+    services.resume_index.remove(resume_id)
+    services.prefetcher.cancel(resume_id)
+    return {"status": "success", "resume_id": resume_id}
+
+@app.post("/index/resumes")
+async def index_resume(data: dict):
+    """Add a stored resume session to the ranking index"""
+    resume_id = data.get("resume_id")
+    session = services.resume_sessions.get(resume_id) if resume_id else None
+    if session is None:
+        raise HTTPException(status_code=404, detail="Resume session not found or expired")
+    
+    services.resume_index.add(resume_id, session["content"], session["filename"])
+    return {"status": "success", "resume_id": resume_id, "indexed": len(services.resume_index)}
+
+@app.delete("/index/resumes/{resume_id}")
+async def unindex_resume(resume_id: str):
+    """Remove a resume from the ranking index"""
+    if not services.resume_index.remove(resume_id):
+        raise HTTPException(status_code=404, detail="Resume is not indexed")
+    return {"status": "success", "resume_id": resume_id}
+
+@app.post("/index/search")
+async def search_resumes(data: dict):
+    """Rank indexed resumes against a job description, optionally queueing LLM analysis of the shortlist"""
+    job_description = data.get("job_description", "")
+    if not isinstance(job_description, str) or not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    top_k = max(1, min(int_field(data, "top_k", 10), 100))
+    analyze_top = max(0, min(int_field(data, "analyze_top", 0), top_k))
+    
+    results = services.resume_index.search(job_description, top_k)
+    for rank, result in enumerate(results):
+        session = services.resume_sessions.get(result["resume_id"])
+        # The index outlives sessions; expired resumes can be ranked but not analyzed
+        result["available"] = session is not None
+        if session is not None and rank < analyze_top:
+            try:
+                result["job"] = await services.job_queue.submit("analyze", {
+                    "resume_content": session["content"],
+                    "job_description": job_description
+                })
+            except JobQueueFullError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    return {"status": "success", "indexed": len(services.resume_index), "results": results}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "API is running"}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def service_stats():
+    """Cache and OpenAI connection pool counters"""
+    return {
+        "parse_cache": services.resume_parser.cache_stats(),
+        "llm_cache": services.ai_analyzer.cache.stats(),
+        "resume_sessions": services.resume_sessions.stats(),
+        "resume_index": services.resume_index.stats(),
+        "prefetch": services.prefetcher.stats(),
+        "openai_pool": openai_clients.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "model_router": model_router.stats()
+    }
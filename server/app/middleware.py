@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only text-like payloads shrink enough to be worth compressing
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported content coding from an Accept-Encoding header (br over gzip on ties)"""
+    weights = {}
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.partition(";")
+        params = params.strip()
+        try:
+            q = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        weights[coding.strip().lower()] = q
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    # max() keeps the first of equal weights, so the preference order breaks ties
+    best = max(supported, key=lambda coding: weights.get(coding, weights.get("*", 0.0)))
+    return best if weights.get(best, weights.get("*", 0.0)) > 0 else None
+
+
+def _opaque_tag(etag: str) -> str:
+    """An entity tag without its weak W/ prefix"""
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _single_body(message: Message) -> bool:
+    """Whether this body message is the whole (non-streaming) response"""
+    return message["type"] == "http.response.body" and not message.get("more_body", False)
+
+
+class CompressionMiddleware:
+    """gzip/brotli compression negotiated from Accept-Encoding
+    
+    Only complete (non-streaming) responses of at least minimum_size bytes are
+    compressed, so SSE and NDJSON streams keep flushing every event as it is sent.
+    """
+    
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start: Optional[Message] = None
+        
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether compression applies
+                start = message
+                return
+            if start is not None:
+                pending, start = start, None
+                headers = MutableHeaders(raw=pending["headers"])
+                compressible = (
+                    headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+                    and "content-encoding" not in headers
+                )
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                body = message.get("body", b"")
+                if compressible and _single_body(message) and len(body) >= self.minimum_size:
+                    body = self.compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+                await send(pending)
+            await send(message)
+        
+        await self.app(scope, receive, send_compressed)
+    
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class ConditionalGetMiddleware:
+    """Weak ETags for complete GET responses, answering If-None-Match with 304
+    
+    Finished jobs and stats that have not changed are then revalidated without
+    resending the body. The tag is taken from the uncompressed body, so it does
+    not depend on the negotiated encoding.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        
+        async def send_tagged(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is not None:
+                pending, start = start, None
+                if pending["status"] == 200 and _single_body(message):
+                    headers = MutableHeaders(raw=pending["headers"])
+                    etag = headers.get("etag")
+                    if etag is None:
+                        etag = 'W/"' + hashlib.blake2b(message.get("body", b""), digest_size=16).hexdigest() + '"'
+                        headers["ETag"] = etag
+                    if if_none_match and self.matches(if_none_match, etag):
+                        del headers["content-length"]
+                        del headers["content-type"]
+                        await send({**pending, "status": 304})
+                        await send({"type": "http.response.body", "body": b""})
+                        return
+                await send(pending)
+            await send(message)
+        
+        await self.app(scope, receive, send_tagged)
+    
+    @staticmethod
+    def matches(if_none_match: str, etag: str) -> bool:
+        """Weak comparison of an If-None-Match list against the response's ETag"""
+        if if_none_match.strip() == "*":
+            return True
+        opaque = _opaque_tag(etag)
+        return any(_opaque_tag(tag.strip()) == opaque for tag in if_none_match.split(","))
@@ -1,7 +1,7 @@
 """
 Pydantic models for API responses
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ResumeAnalysisResponse(BaseModel):
@@ -13,6 +13,15 @@ class ResumeAnalysisResponse(BaseModel):
     keywords: List[str]
     linkedin_suggestions: Optional[List[str]] = None
 
+class StructuredResumeAnalysis(BaseModel):
+    """JSON shape requested from the model in structured-output mode"""
+    ats_score: int = Field(ge=1, le=10)
+    summary: str = ""
+    key_recommendations: List[str] = []
+    missing_keywords: List[str] = []
+    strengths: List[str] = []
+    improvements: List[str] = []
+
 class HealthCheckResponse(BaseModel):
     status: str
     service: str
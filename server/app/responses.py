@@ -0,0 +1,34 @@
+import json
+import logging
+from typing import Any
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.warning("orjson is not installed; responses use the slower stdlib JSON encoder")
+
+# Non-string keys appear in a few stats payloads; orjson rejects them by default
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dump_json_bytes(content: Any) -> bytes:
+    """Compact UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def dump_json(content: Any) -> str:
+    """dump_json_bytes as text, for SSE and NDJSON lines"""
+    return dump_json_bytes(content).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falling back to the stdlib encoder)"""
+    
+    def render(self, content: Any) -> bytes:
+        return dump_json_bytes(content)
@@ -1,48 +1,347 @@
+import asyncio
+import logging
 import os
-import openai
-from typing import Dict, List, Optional
+import re
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+from pydantic import ValidationError
+from .ats_scorer import ATSScorer
+from .json_repair import load_json_object
+from .llm_cache import LLMResponseCache, create_llm_cache
+from .metrics import observe_stage, record_time_to_first_token, record_token_usage, track_stage
+from .model_router import model_router
+from .prompt_compactor import PromptCompactor
+from .resume_sections import ResumeSection, segment_resume
+from ..models.response_models import StructuredResumeAnalysis
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SYSTEM_PROMPT = "You are an expert resume reviewer and career counselor. Provide detailed, actionable feedback."
+
+STRUCTURED_SYSTEM_PROMPT = (
+    "You are an expert resume reviewer and career counselor. "
+    "Respond only with a single JSON object that matches the requested schema."
+)
+
+SECTION_SYSTEM_PROMPT = (
+    "You are an expert resume reviewer. You review one section of a resume at a time. "
+    "Respond only with a single JSON object that matches the requested schema."
+)
+
+# How much each section counts towards the merged score in incremental mode
+_SECTION_WEIGHTS = {"summary": 1, "experience": 3, "education": 1, "skills": 2, "other": 1}
+
+# Score patterns, tried in order of preference
+_SCORE_PATTERNS = [
+    re.compile(r'(\d+)/10'),
+    re.compile(r'Score:?\s*(\d+)', re.IGNORECASE),
+    re.compile(r'rate.*?(\d+)', re.IGNORECASE)
+]
+
+# Trigger words for each extracted list; a word may feed more than one list
+_TRIGGER_CATEGORIES = {
+    "recommend": {"key_recommendations"},
+    "suggest": {"key_recommendations"},
+    "should": {"key_recommendations"},
+    "improve": {"key_recommendations", "improvements"},
+    "strength": {"strengths"},
+    "good": {"strengths"},
+    "excellent": {"strengths"},
+    "strong": {"strengths"},
+    "fix": {"improvements"},
+    "change": {"improvements"},
+    "update": {"improvements"},
+    "add": {"improvements"},
+    "keyword": set(),
+    "missing": set()
+}
+
+# Every line is checked against this shared trigger table once; plain substring
+# tests beat a regex alternation here and also catch overlapping triggers
+_TRIGGER_WORDS = tuple(_TRIGGER_CATEGORIES)
+
+# Maximum number of items kept for each list
+_LINE_LIMITS = {
+    "key_recommendations": 5,
+    "missing_keywords": 10,
+    "strengths": 3,
+    "improvements": 5
+}
 
 
 class AIAnalyzer:
     """Service for AI-powered resume analysis using OpenAI GPT"""
     
-    def __init__(self):
-        self.client = openai.AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-        self.model = "gpt-3.5-turbo"
+    def __init__(self, client: Optional["openai.AsyncOpenAI"] = None):
+        # None lets the model router pick an endpoint from the shared, pooled clients
+        self._client = client
+        self.model = model_router.model_for("analysis")
+        self.temperature = 0.7
+        self.cache: LLMResponseCache = create_llm_cache("analysis")
+        self.compactor = PromptCompactor(self.model)
+        self.ats_scorer = ATSScorer()
+        # "json" asks the model for schema-validated JSON; markdown scraping
+        # remains as the fallback when the JSON cannot be repaired
+        self.structured_output = os.getenv("ANALYSIS_OUTPUT_MODE", "markdown").lower() == "json"
+        # Analyze and cache each section separately so edits only re-send what changed
+        self.incremental = os.getenv("ANALYSIS_INCREMENTAL", "false").lower() == "true"
+        if self.incremental and self.cache.store is None:
+            # Without a cache every request would pay one call per section instead of one in total
+            logger.warning("ANALYSIS_INCREMENTAL needs an LLM cache; analyzing whole resumes with LLM_CACHE_BACKEND=none")
+            self.incremental = False
     
     async def analyze_resume(self, resume_content: str, job_description: str = "") -> Dict:
         """Analyze resume content with AI and provide feedback"""
         
-        prompt = self._build_analysis_prompt(resume_content, job_description)
+        structured = self.structured_output
+        local_ats = self.ats_scorer.score(resume_content, job_description)
+        if self.incremental:
+            with track_stage("segment"):
+                sections = [section for section in segment_resume(resume_content) if section.name != "contact"]
+            # Unstructured text gains nothing from being split
+            if len(sections) >= 2:
+                try:
+                    return await self._analyze_sections(resume_content, sections, job_description, local_ats)
+                except Exception as e:
+                    raise Exception(f"Error analyzing resume: {str(e)}") from e
+        
+        with track_stage("prompt_build"):
+            compaction = self.compactor.compact(resume_content)
+            prompt = self._build_analysis_prompt(compaction.text, job_description, structured)
+        system_prompt = STRUCTURED_SYSTEM_PROMPT if structured else ANALYSIS_SYSTEM_PROMPT
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            cache_key = self.cache.make_key(self.model, self.temperature, system_prompt, prompt)
+            analysis_text = await self.cache.get_or_create(
+                cache_key, lambda: self._complete_analysis(prompt, structured)
+            )
+            
+            # Parse the response into structured format
+            with track_stage("postprocess"):
+                if structured:
+                    analysis = self._parse_structured_response(analysis_text, local_ats["ats_score"])
+                else:
+                    analysis = self._parse_analysis_response(analysis_text, local_ats["ats_score"])
+            analysis["local_ats"] = local_ats
+            analysis["prompt_compaction"] = compaction.report()
+            return analysis
+        
+        except Exception as e:
+            raise Exception(f"Error analyzing resume: {str(e)}") from e
+    
+    async def stream_analysis(self, resume_content: str, job_description: str = "") -> AsyncIterator[Dict]:
+        """Stream analysis tokens as they arrive, finishing with the structured result
+        
+        Yields {"event": "ats", "data": {...}} with the local score first, then
+        {"event": "token", "data": {"content": ...}} for each chunk and finally a single
+        {"event": "result", "data": {...}} with the fields produced by _parse_analysis_response.
+        """
+        
+        local_ats = self.ats_scorer.score(resume_content, job_description)
+        yield {"event": "ats", "data": local_ats}
+        
+        with track_stage("prompt_build"):
+            compaction = self.compactor.compact(resume_content)
+            prompt = self._build_analysis_prompt(compaction.text, job_description)
+        cache_key = self.cache.make_key(self.model, self.temperature, ANALYSIS_SYSTEM_PROMPT, prompt)
+        
+        analysis_text = self.cache.get(cache_key)
+        if analysis_text is not None:
+            yield {"event": "token", "data": {"content": analysis_text}}
+        else:
+            started = time.perf_counter()
+            first_token_at = None
+            try:
+                stream = await model_router.create(
+                    "analysis",
+                    client=self._client,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": ANALYSIS_SYSTEM_PROMPT
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=self.temperature,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                
+                chunks = []
+                async for chunk in stream:
+                    # With include_usage the final chunk carries usage and no choices
+                    record_token_usage(getattr(chunk, "usage", None))
+                    model_router.record_cost(self.model, getattr(chunk, "usage", None))
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            record_time_to_first_token(first_token_at - started)
+                        chunks.append(content)
+                        yield {"event": "token", "data": {"content": content}}
+            
+            except Exception as e:
+                yield {"event": "error", "data": {"detail": f"Error analyzing resume: {str(e)}"}}
+                return
+            
+            observe_stage("llm", time.perf_counter() - started)
+            analysis_text = "".join(chunks)
+            self.cache.set(cache_key, analysis_text)
+        
+        with track_stage("postprocess"):
+            analysis = self._parse_analysis_response(analysis_text, local_ats["ats_score"])
+        analysis["local_ats"] = local_ats
+        analysis["prompt_compaction"] = compaction.report()
+        yield {"event": "result", "data": analysis}
+    
+    async def _analyze_sections(
+        self, resume_content: str, sections: List[ResumeSection], job_description: str, local_ats: Dict
+    ) -> Dict:
+        """Analyze each section under its own cache key and merge the results
+        
+        Keys cover the full section prompt (section text, job description and
+        template) and the route's model and max_tokens, so after an edit only the
+        changed sections are sent to the model again, and a prompt or route change
+        never serves results produced under the old one.
+        """
+        
+        with track_stage("prompt_build"):
+            compactions = [self.compactor.compact(section.text) for section in sections]
+            route = model_router.route("analysis_section")
+            requests = []
+            for section, compaction in zip(sections, compactions):
+                prompt = self._build_section_prompt(section.name, compaction.text, job_description)
+                key = self.cache.make_key(
+                    model_router.model_for("analysis_section"), self.temperature, SECTION_SYSTEM_PROMPT,
+                    f"max_tokens={route.max_tokens}\n{prompt}"
+                )
+                requests.append((prompt, key))
+        
+        results = await asyncio.gather(*(self._section_analysis(prompt, key) for prompt, key in requests))
+        
+        with track_stage("postprocess"):
+            parsed = [
+                self._parse_structured_response(text, local_ats["ats_score"]) for text, _ in results
+            ]
+            analysis = self._merge_section_analyses(resume_content, sections, parsed)
+        analysis["sections"] = [
+            {"name": section.name, "fingerprint": section.fingerprint, "ats_score": result["ats_score"], "reused": reused}
+            for section, result, (_, reused) in zip(sections, parsed, results)
+        ]
+        reused_count = sum(1 for _, reused in results if reused)
+        analysis["incremental"] = {
+            "sections": len(sections),
+            "reused": reused_count,
+            "analyzed": len(sections) - reused_count
+        }
+        analysis["local_ats"] = local_ats
+        analysis["prompt_compaction"] = {
+            "tokens_before": sum(compaction.tokens_before for compaction in compactions),
+            "tokens_after": sum(compaction.tokens_after for compaction in compactions),
+            "truncated": any(compaction.truncated for compaction in compactions)
+        }
+        return analysis
+    
+    async def _section_analysis(self, prompt: str, key: str):
+        """Section analysis text and whether it came from the cache"""
+        
+        analyzed = False
+        
+        async def create() -> str:
+            nonlocal analyzed
+            analyzed = True
+            return await self._complete_analysis(prompt, True, SECTION_SYSTEM_PROMPT, task="analysis_section")
+        
+        text = await self.cache.get_or_create(key, create)
+        return text, not analyzed
+    
+    def _merge_section_analyses(self, resume_content: str, sections: List[ResumeSection], parsed: List[Dict]) -> Dict:
+        """Combine per-section results into the usual analysis fields"""
+        
+        weights = [_SECTION_WEIGHTS.get(section.name, 1) for section in sections]
+        score = sum(result["ats_score"] * weight for result, weight in zip(parsed, weights)) / sum(weights)
+        # Heaviest sections first so the most important advice survives the limits
+        ordered = [parsed[index] for index in sorted(range(len(parsed)), key=lambda index: -weights[index])]
+        
+        merged = {}
+        for field in ("key_recommendations", "strengths", "improvements"):
+            merged[field] = self._interleave([result[field] for result in ordered], _LINE_LIMITS[field])
+        # A keyword one section lacks may well appear in another
+        lowered = resume_content.lower()
+        merged["missing_keywords"] = self._interleave(
+            [[keyword for keyword in result["missing_keywords"] if keyword.lower() not in lowered] for result in ordered],
+            _LINE_LIMITS["missing_keywords"]
+        )
+        
+        raw_sections = [f"**Overall Score: {round(score)}/10**"]
+        for section, result in zip(sections, parsed):
+            score_line = f"**Overall Score: {result['ats_score']}/10**"
+            body = result["raw_analysis"]
+            if body.startswith(score_line):
+                body = body[len(score_line):].strip()
+            raw_sections.append(f"## {section.name.title()} ({result['ats_score']}/10)\n\n{body}")
+        
+        return {
+            "raw_analysis": "\n\n".join(raw_sections),
+            "ats_score": max(1, min(10, round(score))),
+            **merged
+        }
+    
+    @staticmethod
+    def _interleave(lists: List[List[str]], limit: int) -> List[str]:
+        """Round-robin items from several lists, skipping duplicates, up to limit"""
+        
+        merged = []
+        for position in range(max((len(items) for items in lists), default=0)):
+            for items in lists:
+                if position < len(items) and items[position] not in merged:
+                    merged.append(items[position])
+                    if len(merged) >= limit:
+                        return merged
+        return merged
+    
+    async def _complete_analysis(
+        self, prompt: str, structured: bool = False, system_prompt: Optional[str] = None, task: str = "analysis"
+    ) -> str:
+        """Request the analysis completion from the model"""
+        
+        extra = {}
+        if structured:
+            extra["response_format"] = {"type": "json_object"}
+            # Unusable JSON from the small model is escalated to the large one
+            extra["validate"] = lambda text: self._load_structured_analysis(text) is not None
+        if system_prompt is None:
+            system_prompt = STRUCTURED_SYSTEM_PROMPT if structured else ANALYSIS_SYSTEM_PROMPT
+        with track_stage("llm"):
+            response = await model_router.create(
+                task,
+                client=self._client,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert resume reviewer and career counselor. Provide detailed, actionable feedback."
+                        "content": system_prompt
                     },
                     {
                         "role": "user",
                         "content": prompt
                     }
                 ],
-                temperature=0.7,
-                max_tokens=2000
+                temperature=self.temperature,
+                **extra
             )
-            
-            analysis_text = response.choices[0].message.content
-            
-            # Parse the response into structured format
-            return self._parse_analysis_response(analysis_text)
         
-        except Exception as e:
-            raise Exception(f"Error analyzing resume: {str(e)}")
+        record_token_usage(response.usage)
+        return response.choices[0].message.content
     
-    def _build_analysis_prompt(self, resume_content: str, job_description: str = "") -> str:
+    def _build_analysis_prompt(self, resume_content: str, job_description: str = "", structured: bool = False) -> str:
         """Build the prompt for AI analysis"""
         
         base_prompt = f"""
@@ -61,6 +360,19 @@ class AIAnalyzer:
             Please also provide specific feedback on how well this resume matches the job requirements.
             """
         
+        if structured:
+            base_prompt += """
+        
+        Return a JSON object with exactly these fields:
+        - "ats_score": integer from 1 to 10 rating the resume overall and for ATS compatibility
+        - "summary": a short paragraph with your overall assessment
+        - "key_recommendations": up to 5 specific, actionable recommendations
+        - "missing_keywords": up to 10 important keywords the resume is missing
+        - "strengths": up to 3 notable strengths
+        - "improvements": up to 5 concrete improvements to content, format or structure
+        """
+            return base_prompt
+        
         base_prompt += """
         
         Please provide feedback in the following areas:
@@ -77,86 +389,146 @@ class AIAnalyzer:
         
         return base_prompt
     
-    def _parse_analysis_response(self, analysis_text: str) -> Dict:
+    def _build_section_prompt(self, section_name: str, section_text: str, job_description: str = "") -> str:
+        """Build the prompt for analyzing a single resume section"""
+        
+        prompt = f"""
+        Please review the {section_name.upper()} section of a resume:
+
+        {section_text}
+        """
+        
+        if job_description:
+            prompt += f"""
+            
+            JOB DESCRIPTION:
+            {job_description}
+            
+            Judge how well this section supports the job requirements.
+            """
+        
+        prompt += """
+        
+        Return a JSON object about this section only, with exactly these fields:
+        - "ats_score": integer from 1 to 10 rating this section, including for ATS compatibility
+        - "summary": one or two sentences assessing the section
+        - "key_recommendations": up to 3 specific, actionable recommendations
+        - "missing_keywords": up to 5 important keywords this section should contain
+        - "strengths": up to 2 notable strengths
+        - "improvements": up to 3 concrete improvements to its content or format
+        """
+        
+        return prompt
+    
+    def _parse_analysis_response(self, analysis_text: str, default_score: int = 7) -> Dict:
         """Parse AI response into structured format"""
         
+        sections = self._scan_analysis_lines(analysis_text)
+        
         return {
             "raw_analysis": analysis_text,
-            "ats_score": self._extract_score(analysis_text),
-            "key_recommendations": self._extract_recommendations(analysis_text),
-            "missing_keywords": self._extract_keywords(analysis_text),
-            "strengths": self._extract_strengths(analysis_text),
-            "improvements": self._extract_improvements(analysis_text)
+            "ats_score": self._extract_score(analysis_text, default_score),
+            "key_recommendations": sections["key_recommendations"],
+            "missing_keywords": sections["missing_keywords"],
+            "strengths": sections["strengths"],
+            "improvements": sections["improvements"]
+        }
+    
+    def _parse_structured_response(self, analysis_text: str, default_score: int = 7) -> Dict:
+        """Validate a JSON analysis, repairing it once and falling back to markdown parsing"""
+        
+        analysis = self._load_structured_analysis(analysis_text)
+        if analysis is None:
+            return self._parse_analysis_response(analysis_text, default_score)
+        
+        return {
+            "raw_analysis": self._render_structured_analysis(analysis),
+            "ats_score": analysis.ats_score,
+            "key_recommendations": analysis.key_recommendations[:5],
+            "missing_keywords": analysis.missing_keywords[:10],
+            "strengths": analysis.strengths[:3],
+            "improvements": analysis.improvements[:5]
         }
     
-    def _extract_score(self, text: str) -> int:
+    def _load_structured_analysis(self, analysis_text: str) -> Optional[StructuredResumeAnalysis]:
+        """Parse and validate model JSON, or None if it cannot be salvaged"""
+        
+        try:
+            return StructuredResumeAnalysis.model_validate_json(analysis_text)
+        except ValidationError:
+            pass
+        
+        # Cheap repair: drop code fences and surrounding prose, then trailing commas
+        data = load_json_object(analysis_text)
+        if data is None:
+            return None
+        try:
+            return StructuredResumeAnalysis.model_validate(data)
+        except ValidationError:
+            return None
+    
+    def _render_structured_analysis(self, analysis: StructuredResumeAnalysis) -> str:
+        """Render a structured analysis as markdown for raw_analysis"""
+        
+        sections = [f"**Overall Score: {analysis.ats_score}/10**"]
+        if analysis.summary:
+            sections.append(analysis.summary)
+        for title, items in (
+            ("Strengths", analysis.strengths),
+            ("Key Recommendations", analysis.key_recommendations),
+            ("Improvements", analysis.improvements),
+            ("Missing Keywords", analysis.missing_keywords)
+        ):
+            if items:
+                sections.append(f"### {title}\n" + "\n".join(f"- {item}" for item in items))
+        
+        return "\n\n".join(sections)
+    
+    def _extract_score(self, text: str, default: int = 7) -> int:
         """Extract numerical score from analysis"""
         # Simple extraction - look for patterns like "8/10" or "Score: 7"
-        import re
-        score_patterns = [
-            r'(\d+)/10',
-            r'Score:?\s*(\d+)',
-            r'rate.*?(\d+)'
-        ]
-        
-        for pattern in score_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _SCORE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return int(match.group(1))
         
-        return 7  # Default score if not found
-    
-    def _extract_recommendations(self, text: str) -> List[str]:
-        """Extract key recommendations from analysis"""
-        # Simple extraction based on common patterns
-        recommendations = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if any(keyword in line.lower() for keyword in ['recommend', 'suggest', 'should', 'improve']):
-                if len(line) > 20 and not line.startswith('#'):
-                    recommendations.append(line)
-        
-        return recommendations[:5]  # Return top 5 recommendations
-    
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extract missing keywords from analysis"""
-        keywords = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            if 'keyword' in line.lower() and ('missing' in line.lower() or 'add' in line.lower()):
-                # Extract potential keywords from the line
-                words = line.split()
-                for word in words:
-                    if len(word) > 3 and word.isalpha():
-                        keywords.append(word)
-        
-        return list(set(keywords))[:10]  # Return unique keywords, max 10
+        return default  # Local ATS score when the model gives none
     
-    def _extract_strengths(self, text: str) -> List[str]:
-        """Extract strengths from analysis"""
-        strengths = []
-        lines = text.split('\n')
+    def _scan_analysis_lines(self, text: str) -> Dict[str, List[str]]:
+        """Classify every line of the analysis in a single pass
         
-        for line in lines:
-            line = line.strip()
-            if any(keyword in line.lower() for keyword in ['strength', 'good', 'excellent', 'strong']):
-                if len(line) > 20 and not line.startswith('#'):
-                    strengths.append(line)
+        Recommendations, strengths and improvements are descriptive lines (longer than
+        20 characters, not headers) containing one of their trigger words. Missing
+        keywords are the alphabetic words of lines that mention a missing/added keyword.
+        """
         
-        return strengths[:3]  # Return top 3 strengths
-    
-    def _extract_improvements(self, text: str) -> List[str]:
-        """Extract improvement suggestions from analysis"""
-        improvements = []
-        lines = text.split('\n')
+        found = {category: [] for category in _LINE_LIMITS}
+        seen_keywords = set()
+        remaining = set(_LINE_LIMITS)
         
-        for line in lines:
-            line = line.strip()
-            if any(keyword in line.lower() for keyword in ['improve', 'fix', 'change', 'update', 'add']):
-                if len(line) > 20 and not line.startswith('#'):
-                    improvements.append(line)
+        # str.lower() never adds or removes newlines, so the two splits line up
+        for line, lowered in zip(text.split('\n'), text.lower().split('\n')):
+            triggers = [word for word in _TRIGGER_WORDS if word in lowered]
+            if not triggers:
+                continue
+            
+            if "keyword" in triggers and ("missing" in triggers or "add" in triggers):
+                keywords = found["missing_keywords"]
+                for word in line.split():
+                    if len(keywords) >= _LINE_LIMITS["missing_keywords"]:
+                        break
+                    if len(word) > 3 and word.isalpha() and word not in seen_keywords:
+                        seen_keywords.add(word)
+                        keywords.append(word)
+            
+            stripped = line.strip()
+            if len(stripped) > 20 and not stripped.startswith('#'):
+                categories = set().union(*(_TRIGGER_CATEGORIES[word] for word in triggers))
+                for category in categories & remaining:
+                    found[category].append(stripped)
+            
+            remaining = {category for category in remaining if len(found[category]) < _LINE_LIMITS[category]}
+            if not remaining:
+                break
         
-        return improvements[:5]  # Return top 5 improvements
+        return found
@@ -0,0 +1,157 @@
+import math
+import os
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from .resume_sections import SECTION_HEADINGS
+
+# Lower-cased tokens that keep tech spellings intact: c++, c#, node.js, ci/cd, scikit-learn
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+
+# Common English plus job-ad boilerplate that says nothing about fit
+_STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each etc few for from further had has
+have having he her here hers him his how i if in into is it its itself just me more most my no nor not of
+off on once only or other our ours out over own per same she should so some such than that the their
+theirs them then there these they this those through to too under until up upon very via was we were
+what when where which while who whom why will with within without would you your yours
+ability able candidate candidates company day excellent experience experienced familiarity good great
+help ideal including join knowledge looking must need new nice opportunity plus preferred required
+requirements responsibilities responsible role skill skills strong team teams work working year years
+""".split())
+
+# Skills weigh double when they appear in the job description
+SKILL_LEXICON = frozenset("""
+python java javascript typescript go golang rust c c++ c# ruby php kotlin swift scala r sql nosql bash
+html css react angular vue next.js node.js express django flask fastapi spring .net rails graphql rest
+grpc postgresql mysql sqlite mongodb redis elasticsearch cassandra dynamodb kafka rabbitmq spark hadoop
+airflow dbt snowflake bigquery pandas numpy scikit-learn pytorch tensorflow keras nlp llm mlops
+aws azure gcp docker kubernetes terraform ansible jenkins ci/cd git github gitlab linux prometheus grafana
+microservices serverless agile scrum jira figma tableau excel
+""".split()) | frozenset([
+    "machine learning", "deep learning", "data science", "computer vision", "data engineering",
+    "rest apis", "unit testing", "project management", "product management", "system design",
+    "distributed systems", "cloud computing", "data analysis"
+])
+
+# BM25 term-frequency saturation and length normalisation
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+KEYWORD_LIMIT = 15
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stopwords or bare numbers"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        token = token.rstrip(".-/")
+        if token and token not in _STOPWORDS and not token.isdigit() and (len(token) > 1 or token in SKILL_LEXICON):
+            tokens.append(token)
+    return tokens
+
+
+def term_vector(tokens: List[str]) -> Counter:
+    """Sparse term-frequency vector of unigrams plus adjacent-word bigrams"""
+    vector = Counter(tokens)
+    vector.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return vector
+
+
+@lru_cache(maxsize=256)
+def job_terms(job_description: str) -> Tuple[Tuple[str, float], ...]:
+    """Weighted job-description terms, heaviest first; cached since one job is scored against many resumes"""
+    counts = term_vector(tokenize(job_description))
+    weights = {}
+    for term, count in counts.items():
+        is_bigram = " " in term
+        # Bigrams only count when they name a known skill or repeat in the description
+        if is_bigram and term not in SKILL_LEXICON and count < 2:
+            continue
+        weight = 1 + math.log(count)
+        if term in SKILL_LEXICON:
+            weight *= 2
+        if is_bigram:
+            weight *= 1.5
+        weights[term] = weight
+    return tuple(sorted(weights.items(), key=lambda item: (-item[1], item[0])))
+
+
+class ATSScorer:
+    """Deterministic keyword and section scorer that runs locally, without an LLM call"""
+    
+    def __init__(self):
+        # Typical resume length in tokens, used for BM25 length normalisation
+        self.average_length = int(os.getenv("ATS_AVERAGE_RESUME_TOKENS", "350"))
+    
+    def score(self, resume_content: str, job_description: str = "") -> Dict:
+        """Score a resume from 0-100 (and 1-10 as ats_score) with matched/missing keywords"""
+        started = time.perf_counter()
+        tokens = tokenize(resume_content)
+        resume_vector = term_vector(tokens)
+        sections = self.detect_sections(resume_content)
+        section_score = sum(sections.values()) / len(sections)
+        skills_found = sorted(term for term in resume_vector if term in SKILL_LEXICON)
+        
+        weighted_terms = job_terms(job_description) if job_description.strip() else ()
+        if weighted_terms:
+            length_norm = 1 - _BM25_B + _BM25_B * max(len(tokens), 1) / self.average_length
+            total_weight = matched_weight = 0.0
+            skill_total = skill_matched = 0
+            matched, missing = [], []
+            for term, weight in weighted_terms:
+                frequency = resume_vector.get(term, 0)
+                # One mention in an average-length resume counts fully; longer resumes need more
+                strength = min(1.0, frequency * (_BM25_K1 + 1) / (frequency + _BM25_K1 * length_norm))
+                total_weight += weight
+                matched_weight += weight * strength
+                if term in SKILL_LEXICON:
+                    skill_total += 1
+                    skill_matched += frequency > 0
+                (matched if frequency else missing).append(term)
+            keyword_score = matched_weight / total_weight
+            skill_score = skill_matched / skill_total if skill_total else keyword_score
+            score = 100 * (0.6 * keyword_score + 0.15 * skill_score + 0.25 * section_score)
+        else:
+            # Without a job description, judge structure and breadth of listed skills
+            keyword_score = skill_score = min(1.0, len(skills_found) / 12)
+            matched, missing = skills_found, []
+            score = 100 * (0.4 * skill_score + 0.6 * section_score)
+        
+        # "rest apis" already names "rest" and "apis"; don't list the parts again
+        phrase_words = {word for term in missing if " " in term for word in term.split()}
+        missing = [term for term in missing if " " in term or term not in phrase_words]
+        
+        return {
+            "score": round(score, 1),
+            "ats_score": max(1, min(10, round(score / 10))),
+            "matched_keywords": matched[:KEYWORD_LIMIT],
+            "missing_keywords": missing[:KEYWORD_LIMIT],
+            "sections": sections,
+            "components": {
+                "keywords": round(keyword_score, 3),
+                "skills": round(skill_score, 3),
+                "sections": round(section_score, 3)
+            },
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+    
+    def detect_sections(self, resume_content: str) -> Dict[str, bool]:
+        """Which standard sections (and contact details) the resume contains"""
+        found = {section: False for section in SECTION_HEADINGS}
+        for line in resume_content.splitlines():
+            heading = line.strip().strip(":#*").strip().lower()
+            # Headings are short lines; long ones are body text that merely mentions a word
+            if not heading or len(heading) > 40:
+                continue
+            for section, keywords in SECTION_HEADINGS.items():
+                if not found[section] and any(keyword in heading for keyword in keywords):
+                    found[section] = True
+        found["contact"] = bool(_EMAIL.search(resume_content) or _PHONE.search(resume_content))
+        return found
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import zipfile
+from functools import partial
+from typing import IO, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Tuple
+from fastapi import UploadFile
+from .ai_analyzer import AIAnalyzer
+from .llm_scheduler import PRIORITY_BATCH, llm_priority
+from .resume_parser import ParserBusyError, ResumeParser
+
+
+class BatchDocument(NamedTuple):
+    """A resume in a batch; its bytes are read (or decompressed) only when it is parsed"""
+    filename: str
+    size: int
+    read: Callable[[], Awaitable[bytes]]
+
+
+async def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Decompress one archive member in the default executor"""
+    return await asyncio.get_running_loop().run_in_executor(None, archive.read, info)
+
+
+class BatchAnalyzer:
+    """Service for screening many resumes against a single job description"""
+    
+    def __init__(self, resume_parser: ResumeParser, ai_analyzer: AIAnalyzer):
+        self.resume_parser = resume_parser
+        self.ai_analyzer = ai_analyzer
+        self.max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+        self.max_files = int(os.getenv("BATCH_MAX_FILES", "500"))
+        self.max_retries = int(os.getenv("BATCH_MAX_RETRIES", "3"))
+        # Sum of all document sizes after zip expansion; 0 disables the check
+        self.max_total_size = int(os.getenv("BATCH_MAX_TOTAL_SIZE", str(200 * 1024 * 1024)))
+    
+    def collect_documents(self, uploads: List[Tuple[str, UploadFile]]) -> List[BatchDocument]:
+        """Expand zip archives into one lazily read document per resume, enforcing the batch limits
+        
+        Only zip directories are read here; uploads stay in Starlette's spooled files
+        and members are decompressed when their turn to be parsed comes.
+        """
+        
+        documents = []
+        for filename, upload in uploads:
+            if filename.lower().endswith('.zip'):
+                documents.extend(self._zip_members(filename, upload.file))
+            else:
+                documents.append(BatchDocument(filename, upload.size or 0, upload.read))
+            if len(documents) > self.max_files:
+                raise ValueError(f"Batch contains more than {self.max_files} resumes")
+        
+        total_size = sum(document.size for document in documents)
+        if self.max_total_size and total_size > self.max_total_size:
+            raise ValueError(f"Batch expands to {total_size} bytes; the limit is {self.max_total_size}")
+        
+        return documents
+    
+    def _zip_members(self, filename: str, archive_file: IO[bytes]) -> List[BatchDocument]:
+        """PDF/DOCX members of a zip archive, skipping anything else"""
+        
+        try:
+            archive = zipfile.ZipFile(archive_file)
+        except zipfile.BadZipFile:
+            raise ValueError(f"{filename} is not a valid zip archive")
+        
+        documents = []
+        for info in archive.infolist():
+            if info.is_dir() or not self.resume_parser.validate_file_format(info.filename):
+                continue
+            # zipfile stops reading a member at its declared size, so the limits hold after decompression
+            if info.file_size > self.resume_parser.max_file_size:
+                raise ValueError(f"{info.filename} in {filename} exceeds the maximum file size")
+            documents.append(BatchDocument(info.filename, info.file_size, partial(_read_member, archive, info)))
+            if len(documents) > self.max_files:
+                break
+        
+        return documents
+    
+    async def analyze_batch(self, documents: List[BatchDocument], job_description: str = "") -> AsyncIterator[Dict]:
+        """Parse and analyze documents concurrently, yielding one event per resume as it finishes"""
+        
+        total = len(documents)
+        yield {"type": "start", "total": total}
+        
+        # Parsing is capped at the pool size so a batch never pushes interactive
+        # uploads into the parser's 503 path
+        parse_semaphore = asyncio.Semaphore(max(1, self.resume_parser.max_workers))
+        llm_semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        tasks = [
+            asyncio.create_task(
+                self._process(index, document, job_description, parse_semaphore, llm_semaphore)
+            )
+            for index, document in enumerate(documents)
+        ]
+        
+        completed = succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                completed += 1
+                succeeded += item["type"] == "result"
+                item["progress"] = {"completed": completed, "total": total}
+                yield item
+        finally:
+            # Stop outstanding work if the client goes away mid-batch
+            for task in tasks:
+                task.cancel()
+        
+        yield {"type": "summary", "total": total, "succeeded": succeeded, "failed": total - succeeded}
+    
+    async def _process(self, index: int, document: BatchDocument, job_description: str,
+                       parse_semaphore: asyncio.Semaphore, llm_semaphore: asyncio.Semaphore) -> Dict:
+        """Read, parse and analyze a single resume, turning failures (corrupt zip members too) into an error item"""
+        
+        filename = document.filename
+        stage = "parse"
+        try:
+            async with parse_semaphore:
+                # Only the documents being parsed are held in memory
+                resume_content = await self._parse(filename, await document.read())
+            if not resume_content:
+                raise ValueError("No text could be extracted from the document")
+            
+            stage = "analyze"
+            async with llm_semaphore:
+                analysis = await self._analyze(resume_content, job_description)
+            
+            return {"type": "result", "index": index, "filename": filename, "analysis": analysis}
+        
+        except Exception as e:
+            return {"type": "error", "index": index, "filename": filename, "stage": stage, "detail": str(e)}
+    
+    async def _parse(self, filename: str, content: bytes) -> str:
+        """Parse a document, waiting briefly whenever the parser pool is saturated"""
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.resume_parser.parse_bytes(content, filename)
+            except ParserBusyError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(0.5 * (attempt + 1))
+    
+    async def _analyze(self, resume_content: str, job_description: str) -> Dict:
+        """Analyze a resume at batch priority, so interactive requests are admitted first"""
+        
+        # Rate limits and retries are handled centrally by the LLM scheduler
+        with llm_priority(PRIORITY_BATCH):
+            return await self.ai_analyzer.analyze_resume(resume_content, job_description)
@@ -0,0 +1,91 @@
+import logging
+import time
+from functools import cached_property
+from .ai_analyzer import AIAnalyzer
+from .batch_analyzer import BatchAnalyzer
+from .job_queue import JobQueue, create_job_queue
+from .linkedin_optimizer import LinkedInOptimizer
+from .model_router import model_router
+from .openai_client import openai_clients
+from .prefetcher import ResultPrefetcher
+from .resume_index import ResumeIndex
+from .resume_parser import ResumeParser
+from .session_store import ResumeSessionStore
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Creates the application's services on first use and shuts down the ones that exist
+    
+    Nothing is constructed at import time, so workers and tests start quickly;
+    warm_up() builds everything (and loads the heavy libraries) up front.
+    """
+    
+    @cached_property
+    def resume_parser(self) -> ResumeParser:
+        return ResumeParser()
+    
+    @cached_property
+    def ai_analyzer(self) -> AIAnalyzer:
+        return AIAnalyzer()
+    
+    @cached_property
+    def linkedin_optimizer(self) -> LinkedInOptimizer:
+        return LinkedInOptimizer()
+    
+    @cached_property
+    def batch_analyzer(self) -> BatchAnalyzer:
+        return BatchAnalyzer(self.resume_parser, self.ai_analyzer)
+    
+    @cached_property
+    def resume_sessions(self) -> ResumeSessionStore:
+        return ResumeSessionStore()
+    
+    @cached_property
+    def resume_index(self) -> ResumeIndex:
+        return ResumeIndex()
+    
+    @cached_property
+    def prefetcher(self) -> ResultPrefetcher:
+        return ResultPrefetcher({
+            "analyze": lambda content: self.ai_analyzer.analyze_resume(content),
+            "linkedin": lambda content: self.linkedin_optimizer.optimize_profile(content)
+        })
+    
+    @cached_property
+    def job_queue(self) -> JobQueue:
+        return create_job_queue()
+    
+    def _created(self, name: str) -> bool:
+        return name in self.__dict__
+    
+    def warm_up(self) -> float:
+        """Construct every service and preload parsers, the OpenAI client and the tokenizer"""
+        started = time.perf_counter()
+        self.resume_parser.warm_up()
+        self.ai_analyzer.compactor.count_tokens("warm up")
+        self.linkedin_optimizer
+        self.batch_analyzer
+        self.resume_sessions
+        self.resume_index
+        self.prefetcher
+        for endpoint in model_router.endpoints:
+            endpoint.client
+        elapsed = time.perf_counter() - started
+        logger.info("Services warmed up in %.2fs", elapsed)
+        return elapsed
+    
+    async def close(self) -> None:
+        """Stop the job queue and release pools, caches and connections held by the services that were created"""
+        if self._created("job_queue"):
+            await self.job_queue.stop()
+        if self._created("prefetcher"):
+            self.prefetcher.close()
+        if self._created("resume_parser"):
+            self.resume_parser.shutdown()
+        if self._created("ai_analyzer"):
+            self.ai_analyzer.cache.close()
+        if self._created("resume_sessions"):
+            self.resume_sessions.close()
+        await openai_clients.close()
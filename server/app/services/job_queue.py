@@ -0,0 +1,374 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from .metrics import endpoint_context
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class InMemoryJobBackend:
+    """Process-local job storage backed by an asyncio queue"""
+    
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._pending: Optional[asyncio.Queue] = None
+    
+    def _queue(self) -> asyncio.Queue:
+        # Created lazily so it binds to the running event loop
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+        return self._pending
+    
+    async def put(self, job: Dict) -> None:
+        self._jobs[job["id"]] = job
+        await self._queue().put(job["id"])
+    
+    async def next(self) -> Dict:
+        """Wait for the next queued job and mark it running"""
+        while True:
+            job = self._jobs.get(await self._queue().get())
+            if job is not None and job["status"] == JOB_QUEUED:
+                job["status"] = JOB_RUNNING
+                job["updated_at"] = time.time()
+                return job
+    
+    def save(self, job: Dict) -> None:
+        self._jobs[job["id"]] = job
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+    
+    def pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] == JOB_QUEUED)
+    
+    def purge(self, finished_before: float) -> None:
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job["status"] in FINISHED_STATES and job["updated_at"] < finished_before]:
+            del self._jobs[job_id]
+    
+    def recover(self) -> None:
+        """Nothing survives a restart in memory"""
+    
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobBackend:
+    """Durable job storage; queued and interrupted jobs are picked up again after a restart
+    
+    Several processes may share the database. A worker holds a lease on each job it
+    runs and renews it while the job is running; only jobs whose lease has expired
+    (their process died) are requeued, so live workers never have jobs taken away.
+    """
+    
+    def __init__(self, path: str, poll_interval: float = 0.5, lease: float = 60.0):
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._renewer: Optional[asyncio.Task] = None
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    lease_expires REAL
+                )
+                """
+            )
+            # Databases created before leases existed
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (("owner", "TEXT"), ("lease_expires", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+    
+    def _event(self) -> asyncio.Event:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+    
+    async def put(self, job: Dict) -> None:
+        self.save(job)
+        self._event().set()
+    
+    async def next(self) -> Dict:
+        """Claim the oldest queued job, polling so jobs written by other processes are seen"""
+        if self._renewer is None:
+            self._renewer = asyncio.create_task(self._renew_leases())
+        while True:
+            self.recover()
+            job = self._claim()
+            if job is not None:
+                return job
+            
+            event = self._event()
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _claim(self) -> Optional[Dict]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ?, owner = ?, lease_expires = ? WHERE id = ? AND status = ?",
+                (JOB_RUNNING, now, self.owner, now + self.lease, row[0], JOB_QUEUED)
+            ).rowcount
+        return self.get(row[0]) if claimed else None
+    
+    async def _renew_leases(self) -> None:
+        """Extend the leases of the jobs this process is running"""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE owner = ? AND status = ?",
+                    (time.time() + self.lease, self.owner, JOB_RUNNING)
+                )
+    
+    def save(self, job: Dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, kind, status, payload, result, error, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["id"], job["kind"], job["status"], json.dumps(job["payload"]),
+                    json.dumps(job["result"]) if job["result"] is not None else None,
+                    job["error"], job["created_at"], job["updated_at"]
+                )
+            )
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, payload, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "payload": json.loads(row[3]),
+            "result": json.loads(row[4]) if row[4] is not None else None,
+            "error": row[5],
+            "created_at": row[6],
+            "updated_at": row[7]
+        }
+    
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JOB_QUEUED,)).fetchone()[0]
+    
+    def purge(self, finished_before: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (*FINISHED_STATES, finished_before)
+            )
+    
+    def recover(self) -> None:
+        """Requeue running jobs whose worker stopped renewing their lease"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ?, owner = NULL, lease_expires = NULL "
+                "WHERE status = ? AND (lease_expires IS NULL OR lease_expires < ?)",
+                (JOB_QUEUED, now, JOB_RUNNING, now)
+            )
+    
+    def close(self) -> None:
+        """Hand this process's interrupted jobs back to the queue and close the database"""
+        if self._renewer is not None:
+            self._renewer.cancel()
+            self._renewer = None
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, owner = NULL, lease_expires = NULL WHERE owner = ? AND status = ?",
+                    (JOB_QUEUED, self.owner, JOB_RUNNING)
+                )
+            self._conn.close()
+
+
+class JobQueue:
+    """Runs registered job handlers on a pool of background workers"""
+    
+    def __init__(self, backend, workers: int = 4, max_pending: int = 1000, result_ttl: float = 3600):
+        self.backend = backend
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._handlers: Dict[str, Callable[[Dict], Awaitable[Dict]]] = {}
+        self._tasks: List[asyncio.Task] = []
+        # job_id -> one event per wait() call in progress
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+    
+    def register(self, kind: str, handler: Callable[[Dict], Awaitable[Dict]]) -> None:
+        """Register the coroutine that runs jobs of the given kind"""
+        self._handlers[kind] = handler
+    
+    async def start(self) -> None:
+        """Start the worker tasks"""
+        self.backend.recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+    
+    async def stop(self) -> None:
+        """Cancel the workers and release storage; unfinished durable jobs resume on restart"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.backend.close()
+    
+    async def submit(self, kind: str, payload: Dict) -> Dict:
+        """Queue a job and return its public view"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        
+        self.backend.purge(time.time() - self.result_ttl)
+        if self.backend.pending_count() >= self.max_pending:
+            raise JobQueueFullError("Too many jobs are queued, please retry shortly")
+        
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": JOB_QUEUED,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.backend.put(job)
+        return self._public(job)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Public view of a job, or None if unknown"""
+        job = self.backend.get(job_id)
+        return self._public(job) if job is not None else None
+    
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """Wait up to timeout seconds for a job to finish, then return its public view"""
+        job = self.get(job_id)
+        if job is None or job["status"] in FINISHED_STATES:
+            return job
+        
+        # Re-check periodically as well: with a shared SQLite backend the job may
+        # be finished by a worker in another process
+        deadline = time.monotonic() + timeout
+        event = asyncio.Event()
+        self._waiters.setdefault(job_id, set()).add(event)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(remaining, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+                job = self.get(job_id)
+                if job is None or job["status"] in FINISHED_STATES:
+                    return job
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[job_id]
+    
+    async def _worker(self) -> None:
+        while True:
+            job = await self.backend.next()
+            handler = self._handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job['kind']}")
+                with endpoint_context(f"job:{job['kind']}"):
+                    job["result"] = await handler(job["payload"])
+                job["status"] = JOB_SUCCEEDED
+            except asyncio.CancelledError:
+                # Shutting down: leave the job for recovery on the next start
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job["id"])
+                job["status"] = JOB_FAILED
+                job["error"] = str(e)
+            
+            job["updated_at"] = time.time()
+            self.backend.save(job)
+            
+            for event in self._waiters.pop(job["id"], ()):
+                event.set()
+    
+    def _public(self, job: Dict) -> Dict:
+        # The payload holds the resume text, so it is never echoed back
+        return {
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "result": job["result"],
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"]
+        }
+
+
+def create_job_queue() -> JobQueue:
+    """Build a job queue from JOB_* environment settings"""
+    backend_name = os.getenv("JOB_BACKEND", "memory").lower()
+    if backend_name == "memory":
+        backend = InMemoryJobBackend()
+    elif backend_name == "sqlite":
+        backend = SQLiteJobBackend(
+            os.getenv("JOB_DB_PATH", "./cache/jobs.sqlite3"),
+            lease=float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        )
+    else:
+        raise ValueError(f"Unknown JOB_BACKEND: {backend_name}")
+    
+    return JobQueue(
+        backend,
+        workers=int(os.getenv("JOB_WORKERS", "4")),
+        max_pending=int(os.getenv("JOB_MAX_PENDING", "1000")),
+        result_ttl=float(os.getenv("JOB_RESULT_TTL", "3600"))
+    )
@@ -0,0 +1,22 @@
+import json
+import re
+from typing import Dict, Optional
+
+# Trailing commas before a closing bracket are the most common JSON slip from models
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def load_json_object(text: str) -> Optional[Dict]:
+    """Parse a model's JSON object, tolerating code fences, surrounding prose and trailing commas"""
+    
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    candidate = text[start:end + 1]
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            data = json.loads(attempt)
+        except ValueError:
+            continue
+        return data if isinstance(data, dict) else None
+    return None
@@ -1,16 +1,41 @@
+import asyncio
 import os
-import openai
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+from .json_repair import load_json_object
+from .metrics import collect_usage, record_token_usage, track_stage
+from .model_router import model_router
+from .prompt_compactor import PromptCompactor
+
+if TYPE_CHECKING:
+    import openai
+
+COMBINED_SYSTEM_PROMPT = (
+    "You are a LinkedIn optimization expert. Respond only with a single JSON object "
+    "containing the requested profile sections."
+)
+
+SECTIONS = ("headline", "summary", "skills", "recommendations")
+
+# Asked for in both prompts and enforced when validating combined responses
+HEADLINE_MAX_CHARS = 120
 
 
 class LinkedInOptimizer:
     """Service for optimizing LinkedIn profile content"""
     
-    def __init__(self):
-        self.client = openai.AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-        self.model = "gpt-3.5-turbo"
+    def __init__(self, client: Optional["openai.AsyncOpenAI"] = None):
+        # None lets the model router pick an endpoint from the shared, pooled clients
+        self._client = client
+        # Sections are generated concurrently, with their LLM calls admitted by the
+        # shared scheduler; this bounds how long one section may hold up the response
+        self.section_timeout = float(os.getenv("LINKEDIN_SECTION_TIMEOUT", "30"))
+        # The combined call gets a shorter budget of its own: on timeout every section is
+        # regenerated, and the two waits add up
+        self.combined_timeout = float(os.getenv("LINKEDIN_COMBINED_TIMEOUT", "15"))
+        self.compactor = PromptCompactor(model_router.model_for("linkedin_combined"))
+        # "sections" makes one completion per section; "combined" asks for all four as
+        # JSON in a single call (one copy of the resume) and retries only invalid sections
+        self.mode = os.getenv("LINKEDIN_MODE", "sections").lower()
     
     async def optimize_profile(self, resume_content: str, current_profile: Dict = None) -> Dict:
         """Generate optimized LinkedIn profile content based on resume"""
@@ -18,23 +43,145 @@ class LinkedInOptimizer:
         if current_profile is None:
             current_profile = {}
         
-        # Generate optimized content for different profile sections
-        optimized_sections = {}
-        
-        # Optimize headline
-        optimized_sections["headline"] = await self._optimize_headline(resume_content, current_profile.get("headline", ""))
+        # Every section prompt embeds the resume, so compact it once up front
+        with track_stage("prompt_build"):
+            compaction = self.compactor.compact(resume_content)
+        resume_content = compaction.text
+        
+        # Generate optimized content for the different profile sections in parallel
+        section_calls = {
+            "headline": lambda: self._optimize_headline(resume_content, current_profile.get("headline", "")),
+            "summary": lambda: self._optimize_summary(resume_content, current_profile.get("summary", "")),
+            "skills": lambda: self._optimize_skills(resume_content, current_profile.get("skills", [])),
+            "recommendations": lambda: self._generate_profile_recommendations(resume_content, current_profile),
+        }
         
-        # Optimize summary
-        optimized_sections["summary"] = await self._optimize_summary(resume_content, current_profile.get("summary", ""))
+        with collect_usage() as usage:
+            generated = {}
+            if self.mode == "combined":
+                combined = await self._run_section(
+                    self._generate_combined(resume_content, current_profile), self.combined_timeout
+                )
+                generated = self._validate_sections(combined or {})
+            # Sections the combined call did not produce validly fall back to their own call
+            retried = [name for name in SECTIONS if name not in generated]
+            results = await asyncio.gather(
+                *(self._run_section(section_calls[name]()) for name in retried)
+            )
+            generated.update(zip(retried, results))
         
-        # Optimize skills
-        optimized_sections["skills"] = await self._optimize_skills(resume_content, current_profile.get("skills", []))
+        # Sections that timed out come back as None and get a placeholder instead
+        incomplete = [name for name in SECTIONS if generated[name] is None]
+        for name in incomplete:
+            message = f"Error generating {name}: timed out after {self.section_timeout:g}s"
+            generated[name] = [message] if name in ("skills", "recommendations") else message
         
         return {
-            "optimized_profile": optimized_sections,
-            "recommendations": await self._generate_profile_recommendations(resume_content, current_profile)
+            "optimized_profile": {
+                "headline": generated["headline"],
+                "summary": generated["summary"],
+                "skills": generated["skills"]
+            },
+            "recommendations": generated["recommendations"],
+            "incomplete_sections": incomplete,
+            "generation": {
+                "mode": self.mode,
+                "retried_sections": retried if self.mode == "combined" else [],
+                **usage
+            },
+            "prompt_compaction": compaction.report()
         }
     
+    async def _run_section(self, coro, timeout: Optional[float] = None):
+        """Run one section generator under the per-section timeout"""
+        
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout or self.section_timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def _generate_combined(self, resume_content: str, current_profile: Dict) -> Optional[Dict]:
+        """Generate every section from one completion, returning the parsed JSON object"""
+        
+        prompt = f"""
+        Based on the following resume content and current LinkedIn profile, produce optimized LinkedIn content.
+        
+        RESUME CONTENT:
+        {resume_content}
+        
+        CURRENT PROFILE INFO:
+        {current_profile}
+        
+        Return a JSON object with exactly these keys:
+        - "headline": string, professional, keyword-rich, maximum {HEADLINE_MAX_CHARS} characters, highlighting the key value proposition
+        - "summary": string, a 3-4 paragraph first-person summary with relevant keywords, personality and a call to action
+        - "skills": array of the 20 most relevant, searchable skills (technical and soft, current and new relevant ones)
+        - "recommendations": array of 5-7 specific, actionable recommendations covering profile completeness,
+          content optimization, networking, engagement and personal branding
+        """
+        
+        try:
+            with track_stage("llm", section="combined"):
+                response = await model_router.create(
+                    "linkedin_combined",
+                    client=self._client,
+                    # Escalate when the small model leaves sections unusable
+                    validate=self._is_complete_combined,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": COMBINED_SYSTEM_PROMPT
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.7,
+                    response_format={"type": "json_object"}
+                )
+            record_token_usage(response.usage, section="combined")
+            
+            return load_json_object(response.choices[0].message.content or "")
+        
+        except Exception:
+            # Every section is then generated by its own call
+            return None
+    
+    def _validate_sections(self, data: Dict) -> Dict:
+        """Keep only the sections of a combined response that are usable as-is"""
+        
+        valid = {}
+        headline = data.get("headline")
+        if isinstance(headline, str) and 0 < len(headline.strip()) <= HEADLINE_MAX_CHARS:
+            valid["headline"] = headline.strip()
+        
+        summary = data.get("summary")
+        if isinstance(summary, str) and len(summary.strip()) >= 50:
+            valid["summary"] = summary.strip()
+        
+        skills = self._string_list(data.get("skills"), separator=",")
+        if len(skills) >= 3:
+            valid["skills"] = skills[:20]
+        
+        recommendations = [rec for rec in self._string_list(data.get("recommendations"), "\n") if len(rec) > 20]
+        if recommendations:
+            valid["recommendations"] = recommendations[:7]
+        
+        return valid
+    
+    def _is_complete_combined(self, text: str) -> bool:
+        """Whether a combined response has every section in usable form"""
+        return len(self._validate_sections(load_json_object(text) or {})) == len(SECTIONS)
+    
+    def _string_list(self, value, separator: str) -> List[str]:
+        """Normalise a list of strings, or a delimited string, into stripped non-empty items"""
+        if isinstance(value, str):
+            value = value.split(separator)
+        if not isinstance(value, list):
+            return []
+        return [item.strip() for item in value if isinstance(item, str) and item.strip()]
+    
     async def _optimize_headline(self, resume_content: str, current_headline: str = "") -> str:
         """Generate optimized LinkedIn headline"""
         
@@ -42,7 +189,7 @@ class LinkedInOptimizer:
         Based on the following resume content, create an optimized LinkedIn headline that is:
         - Professional and attention-grabbing
         - Keyword-rich for search optimization
-        - Maximum 120 characters
+        - Maximum {HEADLINE_MAX_CHARS} characters
         - Highlights key value proposition
         
         RESUME CONTENT:
@@ -55,21 +202,24 @@ class LinkedInOptimizer:
         """
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a LinkedIn optimization expert. Create compelling, keyword-rich headlines."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.8,
-                max_tokens=500
-            )
+            with track_stage("llm", section="headline"):
+                response = await model_router.create(
+                    "headline",
+                    client=self._client,
+                    validate=lambda text: bool(text.strip()),
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a LinkedIn optimization expert. Create compelling, keyword-rich headlines."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.8
+                )
+            record_token_usage(response.usage, section="headline")
             
             return response.choices[0].message.content.strip()
         
@@ -98,21 +248,24 @@ class LinkedInOptimizer:
         """
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a LinkedIn optimization expert. Create engaging, professional summaries."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=800
-            )
+            with track_stage("llm", section="summary"):
+                response = await model_router.create(
+                    "summary",
+                    client=self._client,
+                    validate=lambda text: len(text.strip()) >= 50,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a LinkedIn optimization expert. Create engaging, professional summaries."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.7
+                )
+            record_token_usage(response.usage, section="summary")
             
             return response.choices[0].message.content.strip()
         
@@ -142,21 +295,24 @@ class LinkedInOptimizer:
         """
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a LinkedIn optimization expert. Suggest relevant, searchable skills."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.6,
-                max_tokens=400
-            )
+            with track_stage("llm", section="skills"):
+                response = await model_router.create(
+                    "skills",
+                    client=self._client,
+                    validate=lambda text: len([skill for skill in text.split(",") if skill.strip()]) >= 3,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a LinkedIn optimization expert. Suggest relevant, searchable skills."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.6
+                )
+            record_token_usage(response.usage, section="skills")
             
             skills_text = response.choices[0].message.content.strip()
             # Parse the comma-separated skills
@@ -189,21 +345,24 @@ class LinkedInOptimizer:
         """
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a LinkedIn strategy expert. Provide actionable profile improvement advice."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=600
-            )
+            with track_stage("llm", section="recommendations"):
+                response = await model_router.create(
+                    "recommendations",
+                    client=self._client,
+                    validate=lambda text: any(len(line.strip()) > 20 for line in text.split("\n")),
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a LinkedIn strategy expert. Provide actionable profile improvement advice."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.7
+                )
+            record_token_usage(response.usage, section="recommendations")
             
             recommendations_text = response.choices[0].message.content.strip()
             # Split into individual recommendations
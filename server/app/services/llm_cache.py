@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Awaitable, Callable, Dict, Optional
+from .cache import LRUCache, SQLiteCache, TieredCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class LLMResponseCache:
+    """Cache for completion text that also coalesces concurrent identical requests"""
+    
+    def __init__(self, store: Optional[TieredCache] = None):
+        # store is None when caching is disabled; coalescing still applies
+        self.store = store
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, prompt: str) -> str:
+        """Build a cache key from the request parameters and whitespace-normalized prompts"""
+        payload = json.dumps(
+            [
+                model,
+                temperature,
+                _WHITESPACE.sub(" ", system_prompt).strip(),
+                _WHITESPACE.sub(" ", prompt).strip()
+            ],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion without calling the model"""
+        if self.store is None:
+            return None
+        return self.store.get(key)
+    
+    def set(self, key: str, value: str) -> None:
+        """Store a completion"""
+        if self.store is not None:
+            self.store.set(key, value)
+    
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached completion, or run create() once for all concurrent callers"""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._create_and_store(key, create))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        
+        # Shield so one caller disconnecting does not cancel the shared request
+        return await asyncio.shield(task)
+    
+    async def _create_and_store(self, key: str, create: Callable[[], Awaitable[str]]) -> str:
+        value = await create()
+        self.set(key, value)
+        return value
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters, including requests served by an in-flight call"""
+        stats = self.store.stats() if self.store is not None else {"hits": 0, "misses": 0}
+        stats["coalesced"] = self.coalesced
+        return stats
+    
+    def close(self) -> None:
+        """Close the persistent backend, if any"""
+        if self.store is not None:
+            self.store.close()
+
+
+def create_llm_cache(namespace: str) -> LLMResponseCache:
+    """Build an LLM response cache from LLM_CACHE_* environment settings"""
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("LLM_CACHE_TTL", "3600")) or None
+    max_entries = int(os.getenv("LLM_CACHE_SIZE", "512"))
+    
+    if backend == "none":
+        return LLMResponseCache()
+    if backend == "memory":
+        return LLMResponseCache(TieredCache(LRUCache(max_entries=max_entries, ttl=ttl)))
+    if backend == "sqlite":
+        path = os.getenv("LLM_CACHE_PATH", "./cache/llm_responses.sqlite3")
+        return LLMResponseCache(TieredCache(
+            LRUCache(max_entries=max_entries, ttl=ttl),
+            SQLiteCache(
+                path,
+                namespace=namespace,
+                max_entries=int(os.getenv("LLM_CACHE_DISK_SIZE", "10000")),
+                ttl=ttl
+            )
+        ))
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
@@ -0,0 +1,290 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from .metrics import LLM_ADMISSION_WAIT_SECONDS
+from .prompt_compactor import PromptCompactor
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+# Lower values are admitted first when a model's budget is exhausted
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+
+
+class PriorityHandle:
+    """A priority that can be raised after calls were queued under it (see LLMScheduler.promote)"""
+    
+    def __init__(self, priority: int):
+        self.priority = priority
+
+
+# Requests default to interactive; batch screening and background jobs opt out
+_current_priority: ContextVar[Union[int, PriorityHandle]] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+def _priority_of(priority: Union[int, PriorityHandle]) -> int:
+    return priority.priority if isinstance(priority, PriorityHandle) else priority
+
+
+@lru_cache(maxsize=None)
+def _retryable_errors() -> tuple:
+    """Errors worth retrying: rate limits, timeouts, dropped connections and 5xx responses"""
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError
+    )
+
+
+@contextmanager
+def llm_priority(priority: Union[int, PriorityHandle]):
+    """Run LLM calls made inside the block at the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """Continuously refilling budget of `rate` units per minute; a rate of 0 means unlimited"""
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate / 60)
+        self.updated_at = now
+    
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        # A single request larger than the whole bucket waits for a full bucket
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing * 60 / self.rate)
+    
+    def consume(self, amount: float) -> None:
+        if self.rate:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+    
+    def refund(self, amount: float) -> None:
+        if self.rate:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+    
+    def drain(self, seconds: float) -> None:
+        """Empty the bucket so the next single unit is admitted after `seconds` (a 429's Retry-After)"""
+        if self.rate:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate / 60)
+
+
+class _ModelLimits:
+    """Request and token buckets for one model plus its priority-ordered waiters"""
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.condition = asyncio.Condition()
+        self.waiters: List[Tuple[int, int]] = []
+    
+    def time_until(self, tokens: int) -> float:
+        return max(self.requests.time_until(1), self.tokens.time_until(tokens))
+
+
+class LLMScheduler:
+    """Single admission point for chat completions
+    
+    Estimates each request's token cost, holds it until the model's RPM/TPM
+    buckets allow it (interactive before batch), and retries rate limits and
+    transient failures with jittered exponential backoff that honours
+    Retry-After.
+    """
+    
+    def __init__(self):
+        self.default_rpm = float(os.getenv("LLM_RPM_LIMIT", "3500"))
+        self.default_tpm = float(os.getenv("LLM_TPM_LIMIT", "200000"))
+        # Per-model overrides: "gpt-4o=500:30000,gpt-3.5-turbo=3500:200000"; malformed entries
+        # are logged and skipped
+        self.model_limits: Dict[str, Tuple[float, float]] = {}
+        for entry in filter(None, (item.strip() for item in os.getenv("LLM_MODEL_LIMITS", "").split(","))):
+            model, _, limits = entry.partition("=")
+            rpm, _, tpm = limits.partition(":")
+            try:
+                self.model_limits[model.strip()] = (float(rpm), float(tpm or self.default_tpm))
+            except ValueError:
+                logger.warning("Ignoring invalid LLM_MODEL_LIMITS entry %r", entry)
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._compactors: Dict[str, PromptCompactor] = {}
+        self._sequence = itertools.count()
+        self._stats = {"admitted": 0, "retries": 0, "rate_limited": 0, "failed": 0, "waiting": 0}
+    
+    async def create(self, client: "openai.AsyncOpenAI", max_retries: Optional[int] = None, **kwargs):
+        """Admit and send a chat.completions.create call, retrying transient failures
+        
+        max_retries overrides LLM_MAX_RETRIES, e.g. 0 when the caller fails over instead.
+        """
+        import openai
+        
+        model = kwargs["model"]
+        estimate = self.estimate_tokens(model, kwargs.get("messages", []), kwargs.get("max_tokens"))
+        limits = self._get_limits(model)
+        if max_retries is None:
+            max_retries = self.max_retries
+        
+        for attempt in range(max_retries + 1):
+            await self._admit(limits, estimate)
+            try:
+                response = await client.chat.completions.create(**kwargs)
+            except _retryable_errors() as e:
+                # The provider spent nothing on a failed call; give the reservation back
+                await self._release(limits, estimate)
+                if attempt == max_retries:
+                    self._stats["failed"] += 1
+                    raise
+                
+                delay = self._retry_after(e)
+                if delay is None:
+                    # Full jitter keeps a burst of failed callers from retrying in lockstep
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if isinstance(e, openai.RateLimitError):
+                    # The provider's limits are tighter than ours; pause every caller of this model
+                    self._stats["rate_limited"] += 1
+                    limits.requests.drain(delay)
+                self._stats["retries"] += 1
+                logger.warning("Retrying %s completion in %.2fs after %s", model, delay, type(e).__name__)
+                await asyncio.sleep(delay)
+                continue
+            
+            # Give back what the estimate over-reserved once the real usage is known
+            usage = getattr(response, "usage", None)
+            if usage is not None and usage.total_tokens:
+                limits.tokens.refund(max(0, estimate - usage.total_tokens))
+            return response
+    
+    async def promote(self, handle: PriorityHandle, priority: int) -> None:
+        """Raise a handle's priority, re-ordering its calls that are already waiting for admission"""
+        if priority >= handle.priority:
+            return
+        handle.priority = priority
+        for limits in list(self._limits.values()):
+            async with limits.condition:
+                limits.condition.notify_all()
+    
+    def estimate_tokens(self, model: str, messages: List[Dict], max_tokens: Optional[int]) -> int:
+        """Prompt tokens plus the completion allowance, as counted against TPM limits"""
+        compactor = self._compactors.get(model)
+        if compactor is None:
+            compactor = self._compactors[model] = PromptCompactor(model)
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        # Roughly 4 tokens of chat framing per message
+        return compactor.count_tokens(prompt) + 4 * len(messages) + (max_tokens or 0)
+    
+    async def _admit(self, limits: _ModelLimits, tokens: int) -> None:
+        """Wait until this request is the highest-priority waiter and the buckets allow it"""
+        current = _current_priority.get()
+        priority = _priority_of(current)
+        waiter = (priority, next(self._sequence))
+        started = time.perf_counter()
+        
+        async with limits.condition:
+            heapq.heappush(limits.waiters, waiter)
+            self._stats["waiting"] += 1
+            # A new high-priority waiter may need to jump ahead of a sleeping one
+            limits.condition.notify_all()
+            try:
+                while True:
+                    if _priority_of(current) != waiter[0]:
+                        # Promoted while queued; keep the original arrival order within the new priority
+                        limits.waiters.remove(waiter)
+                        waiter = (_priority_of(current), waiter[1])
+                        heapq.heapify(limits.waiters)
+                        heapq.heappush(limits.waiters, waiter)
+                    if limits.waiters[0] == waiter:
+                        delay = limits.time_until(tokens)
+                        if delay <= 0:
+                            heapq.heappop(limits.waiters)
+                            limits.requests.consume(1)
+                            limits.tokens.consume(tokens)
+                            break
+                        timeout = delay
+                    else:
+                        timeout = None
+                    try:
+                        await asyncio.wait_for(limits.condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if waiter in limits.waiters:
+                    limits.waiters.remove(waiter)
+                    heapq.heapify(limits.waiters)
+                raise
+            finally:
+                self._stats["waiting"] -= 1
+                limits.condition.notify_all()
+        
+        self._stats["admitted"] += 1
+        LLM_ADMISSION_WAIT_SECONDS.observe(
+            time.perf_counter() - started, priority=_PRIORITY_NAMES.get(priority, str(priority))
+        )
+    
+    async def _release(self, limits: _ModelLimits, tokens: int) -> None:
+        """Return an admitted request's reservation and wake the waiters that may now fit"""
+        limits.requests.refund(1)
+        limits.tokens.refund(tokens)
+        async with limits.condition:
+            limits.condition.notify_all()
+    
+    def _get_limits(self, model: str) -> _ModelLimits:
+        limits = self._limits.get(model)
+        if limits is None:
+            rpm, tpm = self.model_limits.get(model, (self.default_rpm, self.default_tpm))
+            limits = self._limits[model] = _ModelLimits(rpm, tpm)
+        return limits
+    
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """Seconds to wait according to Retry-After(-ms) headers, if present"""
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+        return None
+    
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+# Shared by every service so all completions draw from the same budgets
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,240 @@
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Endpoint label for work done on behalf of the current request (or background job)
+current_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("current_endpoint", default="none")
+# Per-request stage timings collected for the Server-Timing header
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+# Token usage totals for the enclosing collect_usage() block
+_usage_totals: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "usage_totals", default=None
+)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelSet, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelSet, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histogram with labels, rendered with cumulative buckets"""
+    
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per-bucket counts followed by the running sum, for each label set
+        self._values: Dict[LabelSet, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-1] += value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-1])}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+    
+    def __init__(self):
+        self._metrics: List = []
+        self._component_stats: Dict[str, Callable[[], Dict[str, int]]] = {}
+    
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def register_stats(self, component: str, stats: Callable[[], Dict[str, int]]) -> None:
+        """Expose a service's stats() counters (cache hits, pool usage, ...) at scrape time"""
+        self._component_stats[component] = stats
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        
+        if self._component_stats:
+            name = "resume_reviewer_component_stat"
+            lines.append(f"# HELP {name} Counters and gauges reported by service components")
+            lines.append(f"# TYPE {name} gauge")
+            for component, stats in sorted(self._component_stats.items()):
+                for key, value in sorted(stats().items()):
+                    labels = _format_labels((("component", component), ("stat", key)))
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+        
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "resume_reviewer_http_request_seconds", "HTTP request latency by endpoint, method and status"
+)
+STAGE_SECONDS = metrics.histogram(
+    "resume_reviewer_stage_seconds",
+    "Latency of processing stages (upload_read, parse, prompt_build, llm, postprocess)"
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "resume_reviewer_llm_time_to_first_token_seconds", "Time until the first streamed token arrives"
+)
+LLM_ADMISSION_WAIT_SECONDS = metrics.histogram(
+    "resume_reviewer_llm_admission_wait_seconds", "Time LLM calls wait for rate-limit admission, by priority"
+)
+PDF_PAGE_SECONDS = metrics.histogram(
+    "resume_reviewer_pdf_page_seconds", "Text extraction time per PDF page"
+)
+LLM_TOKENS = metrics.counter(
+    "resume_reviewer_llm_tokens_total", "Prompt and completion tokens reported by the model"
+)
+LLM_ROUTE_DECISIONS = metrics.counter(
+    "resume_reviewer_llm_route_total", "Completions by task, model, endpoint and routing reason (primary, failover, escalation)"
+)
+LLM_MODEL_SECONDS = metrics.histogram(
+    "resume_reviewer_llm_model_seconds", "Non-streaming completion latency by model and endpoint"
+)
+LLM_COST_USD = metrics.counter(
+    "resume_reviewer_llm_cost_usd_total", "Estimated completion cost in USD by model, from LLM_MODEL_PRICES"
+)
+PREFETCH_EVENTS = metrics.counter(
+    "resume_reviewer_prefetch_total",
+    "Speculative prefetches by kind and outcome (started, hit, miss, skipped, cancelled, wasted, failed)"
+)
+PREFETCH_SAVED_SECONDS = metrics.histogram(
+    "resume_reviewer_prefetch_saved_seconds", "Work already done by a prefetch when a request attached to it"
+)
+
+
+def observe_stage(stage: str, seconds: float, section: str = "") -> None:
+    """Record a stage duration for the current endpoint (and optional LinkedIn section)"""
+    STAGE_SECONDS.observe(seconds, stage=stage, endpoint=current_endpoint.get(), section=section)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((f"{stage}-{section}" if section else stage, seconds))
+
+
+@contextmanager
+def track_stage(stage: str, section: str = ""):
+    """Time the enclosed block as a processing stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started, section)
+
+
+def record_time_to_first_token(seconds: float, section: str = "") -> None:
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(seconds, endpoint=current_endpoint.get(), section=section)
+
+
+def record_token_usage(usage, section: str = "") -> None:
+    """Count tokens from a completion's usage block, if the response carried one"""
+    if usage is None:
+        return
+    endpoint = current_endpoint.get()
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, kind="prompt", endpoint=endpoint, section=section)
+    LLM_TOKENS.inc(usage.completion_tokens or 0, kind="completion", endpoint=endpoint, section=section)
+    totals = _usage_totals.get()
+    if totals is not None:
+        totals["calls"] += 1
+        totals["prompt_tokens"] += usage.prompt_tokens or 0
+        totals["completion_tokens"] += usage.completion_tokens or 0
+
+
+@contextmanager
+def collect_usage():
+    """Sum the token usage of every completion made inside the block (including child tasks)"""
+    totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    token = _usage_totals.set(totals)
+    try:
+        yield totals
+    finally:
+        _usage_totals.reset(token)
+
+
+@contextmanager
+def endpoint_context(endpoint: str, collect_timings: bool = False):
+    """Label metrics recorded inside the block with the given endpoint"""
+    endpoint_token = current_endpoint.set(endpoint)
+    timings_token = _request_timings.set([] if collect_timings else None)
+    try:
+        yield
+    finally:
+        current_endpoint.reset(endpoint_token)
+        _request_timings.reset(timings_token)
+
+
+def server_timing_header() -> Optional[str]:
+    """Server-Timing value for the stages recorded in the current request"""
+    timings = _request_timings.get()
+    if not timings:
+        return None
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings)
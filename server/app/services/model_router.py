@@ -0,0 +1,260 @@
+import logging
+import os
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .llm_scheduler import _retryable_errors, llm_scheduler
+from .metrics import LLM_COST_USD, LLM_MODEL_SECONDS, LLM_ROUTE_DECISIONS, record_token_usage
+from .openai_client import openai_clients
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+TIER_SMALL = "small"
+TIER_LARGE = "large"
+
+
+class TaskRoute(NamedTuple):
+    tier: str
+    max_tokens: int
+
+
+# Short, well-specified outputs go to the small model; open-ended writing to the large one
+DEFAULT_ROUTES = {
+    "analysis": TaskRoute(TIER_LARGE, 2000),
+    "analysis_section": TaskRoute(TIER_SMALL, 600),
+    "linkedin_combined": TaskRoute(TIER_LARGE, 2000),
+    "headline": TaskRoute(TIER_SMALL, 500),
+    "skills": TaskRoute(TIER_SMALL, 400),
+    "summary": TaskRoute(TIER_LARGE, 800),
+    "recommendations": TaskRoute(TIER_LARGE, 600)
+}
+
+# USD per million prompt/completion tokens; LLM_MODEL_PRICES adds or overrides entries
+DEFAULT_PRICES = {
+    "gpt-3.5-turbo": (0.5, 1.5),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4o": (2.5, 10.0)
+}
+
+# Weight of the newest sample in the latency and error-rate moving averages
+_EWMA_ALPHA = 0.2
+
+
+def _parse_pairs(value: str) -> List[Tuple[str, str]]:
+    """Split "a=1,b=2" settings into stripped (key, value) pairs"""
+    pairs = []
+    for entry in filter(None, (item.strip() for item in value.split(","))):
+        key, _, item = entry.partition("=")
+        pairs.append((key.strip(), item.strip()))
+    return pairs
+
+
+class _Endpoint:
+    """One OpenAI-compatible endpoint and its observed health"""
+    
+    def __init__(self, name: str, base_url: Optional[str], api_key: Optional[str]):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+    
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        return openai_clients.get(self.base_url, self.api_key)
+    
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+    
+    def score(self) -> float:
+        """Lower is better; endpoints without samples score 0 so they get tried"""
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+    
+    def record_success(self, seconds: Optional[float]) -> None:
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.error_rate *= 1 - _EWMA_ALPHA
+        if seconds is not None:
+            self.latency = seconds if self.latency is None else self.latency + _EWMA_ALPHA * (seconds - self.latency)
+    
+    def record_failure(self, threshold: int, cooldown: float) -> None:
+        self.calls += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_rate += _EWMA_ALPHA * (1 - self.error_rate)
+        if self.consecutive_failures >= threshold:
+            self.cooldown_until = time.monotonic() + cooldown
+
+
+class ModelRouter:
+    """Picks the model and endpoint for each completion
+    
+    Every task maps to a small or large model with its own max_tokens. A small-model
+    answer that fails the caller's validation is retried on the large model. Calls
+    go to the healthiest configured endpoint (lowest latency, fewest errors) and
+    fail over to the next one on transient errors; endpoints that keep failing are
+    skipped for a cooldown period.
+    """
+    
+    def __init__(self):
+        default_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.models = {
+            TIER_SMALL: os.getenv("LLM_SMALL_MODEL", default_model),
+            TIER_LARGE: os.getenv("LLM_LARGE_MODEL", default_model)
+        }
+        # Overrides: "headline=large,summary=small:600"; malformed entries are logged and skipped
+        # rather than failing the import of every service
+        self.routes = dict(DEFAULT_ROUTES)
+        for task, route in _parse_pairs(os.getenv("LLM_TASK_ROUTES", "")):
+            tier, _, max_tokens = route.partition(":")
+            default = self.routes.get(task, TaskRoute(TIER_LARGE, 1000))
+            tier = tier or default.tier
+            try:
+                max_tokens = int(max_tokens) if max_tokens else default.max_tokens
+            except ValueError:
+                max_tokens = 0
+            if not task or tier not in self.models or max_tokens <= 0:
+                logger.warning("Ignoring invalid LLM_TASK_ROUTES entry %r", f"{task}={route}")
+                continue
+            self.routes[task] = TaskRoute(tier, max_tokens)
+        
+        self.prices = dict(DEFAULT_PRICES)
+        for model, price in _parse_pairs(os.getenv("LLM_MODEL_PRICES", "")):
+            prompt_price, _, completion_price = price.partition(":")
+            try:
+                self.prices[model] = (float(prompt_price), float(completion_price or prompt_price))
+            except ValueError:
+                logger.warning("Ignoring invalid LLM_MODEL_PRICES entry %r", f"{model}={price}")
+        
+        # "primary=https://api.openai.com/v1,local=http://localhost:9000/v1"; keys come from
+        # LLM_ENDPOINT_<NAME>_API_KEY, falling back to OPENAI_API_KEY
+        self.endpoints = [
+            _Endpoint(name, url, os.getenv(f"LLM_ENDPOINT_{name.upper()}_API_KEY"))
+            for name, url in _parse_pairs(os.getenv("LLM_ENDPOINTS", ""))
+        ] or [_Endpoint("default", None, None)]
+        self.failure_threshold = int(os.getenv("LLM_ENDPOINT_FAILURE_THRESHOLD", "3"))
+        self.cooldown = float(os.getenv("LLM_ENDPOINT_COOLDOWN", "30"))
+        # Share of calls sent to a random endpoint so the others' latency stays measured
+        self.explore = float(os.getenv("LLM_ROUTER_EXPLORE", "0.05"))
+        self._stats = {"calls": 0, "escalations": 0, "failovers": 0}
+        self._cost = 0.0
+    
+    def route(self, task: str) -> TaskRoute:
+        return self.routes.get(task, TaskRoute(TIER_LARGE, 1000))
+    
+    def model_for(self, task: str) -> str:
+        return self.models[self.route(task).tier]
+    
+    async def create(
+        self,
+        task: str,
+        client: Optional["openai.AsyncOpenAI"] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        **kwargs
+    ):
+        """Send a completion for the task, escalating to the large model if validate() rejects it
+        
+        A client passed in (tests, custom setups) bypasses endpoint selection.
+        """
+        route = self.route(task)
+        kwargs.setdefault("max_tokens", route.max_tokens)
+        model = self.models[route.tier]
+        response = await self._send(task, model, client, "primary", kwargs)
+        
+        large_model = self.models[TIER_LARGE]
+        if validate is None or kwargs.get("stream") or model == large_model:
+            return response
+        if validate(response.choices[0].message.content or ""):
+            return response
+        
+        # The rejected answer still cost tokens
+        record_token_usage(response.usage, section=f"{task}_rejected")
+        self._stats["escalations"] += 1
+        logger.info("Escalating %s from %s to %s after failed validation", task, model, large_model)
+        return await self._send(task, large_model, client, "escalation", kwargs)
+    
+    async def _send(self, task: str, model: str, client: Optional["openai.AsyncOpenAI"], reason: str, kwargs: Dict):
+        """Try endpoints in order of health, failing over on transient errors"""
+        candidates = [None] if client is not None else self._ranked_endpoints()
+        for index, endpoint in enumerate(candidates):
+            last = index == len(candidates) - 1
+            started = time.perf_counter()
+            try:
+                response = await llm_scheduler.create(
+                    client or endpoint.client,
+                    # Only the last candidate spends the scheduler's retries; the others fail over
+                    max_retries=None if last else 0,
+                    model=model,
+                    **kwargs
+                )
+            except _retryable_errors() as e:
+                if endpoint is not None:
+                    endpoint.record_failure(self.failure_threshold, self.cooldown)
+                if last:
+                    raise
+                self._stats["failovers"] += 1
+                logger.warning("Failing over from endpoint %s after %s", endpoint.name, type(e).__name__)
+                reason = "failover"
+                continue
+            
+            self._record(task, model, endpoint, reason, response, started, kwargs.get("stream", False))
+            return response
+    
+    def _ranked_endpoints(self) -> List[_Endpoint]:
+        """Available endpoints best-first, then the cooling-down ones as a last resort"""
+        now = time.monotonic()
+        available = sorted((endpoint for endpoint in self.endpoints if endpoint.available(now)), key=_Endpoint.score)
+        cooling = sorted(
+            (endpoint for endpoint in self.endpoints if not endpoint.available(now)),
+            key=lambda endpoint: endpoint.cooldown_until
+        )
+        if len(available) > 1 and random.random() < self.explore:
+            available.insert(0, available.pop(random.randrange(1, len(available))))
+        return available + cooling
+    
+    def _record(
+        self, task: str, model: str, endpoint: Optional[_Endpoint], reason: str, response, started: float, stream: bool
+    ) -> None:
+        name = endpoint.name if endpoint is not None else "custom"
+        elapsed = time.perf_counter() - started
+        self._stats["calls"] += 1
+        LLM_ROUTE_DECISIONS.inc(task=task, model=model, endpoint=name, reason=reason)
+        if stream:
+            # Only the headers have arrived; the latency would not be comparable
+            if endpoint is not None:
+                endpoint.record_success(None)
+            return
+        if endpoint is not None:
+            endpoint.record_success(elapsed)
+        LLM_MODEL_SECONDS.observe(elapsed, model=model, endpoint=name)
+        self.record_cost(model, getattr(response, "usage", None))
+    
+    def record_cost(self, model: str, usage) -> None:
+        """Add a completion's estimated cost (call with the final usage of streamed responses)"""
+        price = self.prices.get(model)
+        if usage is None or price is None:
+            return
+        cost = ((usage.prompt_tokens or 0) * price[0] + (usage.completion_tokens or 0) * price[1]) / 1_000_000
+        self._cost += cost
+        LLM_COST_USD.inc(cost, model=model)
+    
+    def stats(self) -> Dict[str, float]:
+        stats = {**self._stats, "cost_usd": round(self._cost, 6)}
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            stats[f"{endpoint.name}_latency_ms"] = round((endpoint.latency or 0.0) * 1000, 1)
+            stats[f"{endpoint.name}_error_rate"] = round(endpoint.error_rate, 4)
+            stats[f"{endpoint.name}_failures"] = endpoint.failures
+            stats[f"{endpoint.name}_available"] = int(endpoint.available(now))
+        return stats
+
+
+# Shared by every service so endpoint health is learned from all traffic
+model_router = ModelRouter()
@@ -0,0 +1,133 @@
+import logging
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _instrumented_transport_class():
+    """Build the transport class on first use; httpx and openai are imported lazily"""
+    import httpx
+    
+    class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+        """HTTP transport that counts in-flight requests for pool sizing"""
+        
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.active_requests = 0
+            self.peak_active_requests = 0
+            self.requests_total = 0
+        
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            self.active_requests += 1
+            self.requests_total += 1
+            self.peak_active_requests = max(self.peak_active_requests, self.active_requests)
+            try:
+                return await super().handle_async_request(request)
+            finally:
+                self.active_requests -= 1
+    
+    return _InstrumentedTransport
+
+
+class OpenAIClientPool:
+    """Owns the process-wide AsyncOpenAI clients and the HTTP connection pool they share"""
+    
+    def __init__(self):
+        self.max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.keepalive_expiry = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+        self.http2 = os.getenv("OPENAI_HTTP2", "false").lower() == "true"
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", "60"))
+        self.connect_timeout = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+        self.pool_timeout = float(os.getenv("OPENAI_POOL_TIMEOUT", "10"))
+        # Retries and backoff are owned by the LLM scheduler; SDK retries would multiply them
+        self.max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+        # One client per (base_url, api_key); None means the SDK's OPENAI_BASE_URL / default
+        self._clients: Dict[Tuple[Optional[str], Optional[str]], "openai.AsyncOpenAI"] = {}
+        self._http_client = None
+        self._transport = None
+    
+    def get(self, base_url: Optional[str] = None, api_key: Optional[str] = None) -> "openai.AsyncOpenAI":
+        """Return the shared client for an endpoint, creating it on first use"""
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None:
+            import openai
+            
+            client = self._clients[key] = openai.AsyncOpenAI(
+                api_key=api_key or os.getenv("OPENAI_API_KEY"),
+                base_url=base_url,
+                http_client=self._get_http_client(),
+                max_retries=self.max_retries
+            )
+        return client
+    
+    def _get_http_client(self):
+        """The pooled httpx client every endpoint's AsyncOpenAI shares"""
+        if self._http_client is None:
+            import httpx
+            
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("OPENAI_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+                    http2 = False
+            
+            self._transport = _instrumented_transport_class()(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+            self._http_client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=self.pool_timeout)
+            )
+        return self._http_client
+    
+    async def close(self) -> None:
+        """Close every client and pooled connection"""
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._transport = None
+    
+    def stats(self) -> Dict[str, int]:
+        """Connection pool utilization"""
+        stats = {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "open_connections": 0,
+            "idle_connections": 0,
+            "active_requests": 0,
+            "peak_active_requests": 0,
+            "requests_total": 0
+        }
+        if self._transport is None:
+            return stats
+        
+        # httpcore exposes the live connections on the transport's pool
+        connections = getattr(getattr(self._transport, "_pool", None), "connections", [])
+        stats.update(
+            open_connections=len(connections),
+            idle_connections=sum(1 for connection in connections if connection.is_idle()),
+            active_requests=self._transport.active_requests,
+            peak_active_requests=self._transport.peak_active_requests,
+            requests_total=self._transport.requests_total
+        )
+        return stats
+
+
+# Shared by every service; closed from the application lifespan
+openai_clients = OpenAIClientPool()
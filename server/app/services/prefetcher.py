@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from .llm_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, PriorityHandle, llm_priority, llm_scheduler
+from .metrics import PREFETCH_EVENTS, PREFETCH_SAVED_SECONDS, collect_usage, endpoint_context
+
+logger = logging.getLogger(__name__)
+
+# Outcome labels whose stats() key differs
+_OUTCOME_STATS = {"hit": "hits", "miss": "misses"}
+
+
+class _Prefetch:
+    """One speculative task and what it cost"""
+    
+    def __init__(self, client: Optional[str]):
+        self.client = client
+        self.task: Optional[asyncio.Task] = None
+        # Raised to interactive once a request is waiting on the result
+        self.priority = PriorityHandle(PRIORITY_BATCH)
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.tokens = 0
+        self.hits = 0
+
+
+class ResultPrefetcher:
+    """Speculatively runs the follow-up steps of an upload before they are requested
+    
+    After /upload-resume each runner (analysis, LinkedIn) is started in the
+    background at batch priority; a later request for the same resume_id with
+    default inputs attaches to the in-flight or finished result and raises the
+    remaining work to interactive priority. Entries are keyed by resume_id, so
+    clients sharing an address never affect each other's results; the client only
+    counts against PREFETCH_MAX_PER_CLIENT, which stops one caller from taking
+    every slot under PREFETCH_MAX_TOTAL. Prefetches are cancelled when the resume
+    is deleted and dropped when unused past the TTL or when more than
+    PREFETCH_MAX_STORED finished results are held.
+    """
+    
+    def __init__(self, runners: Dict[str, Callable[[str], Awaitable[Dict]]]):
+        self.enabled = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+        self.max_total = int(os.getenv("PREFETCH_MAX_TOTAL", "32"))
+        self.max_per_client = int(os.getenv("PREFETCH_MAX_PER_CLIENT", "4"))
+        self.max_stored = int(os.getenv("PREFETCH_MAX_STORED", "256"))
+        self.ttl = float(os.getenv("PREFETCH_TTL", "900"))
+        self.runners = runners
+        self._entries: Dict[Tuple[str, str], _Prefetch] = {}
+        self._stats = {
+            "started": 0, "hits": 0, "in_flight_hits": 0, "misses": 0, "skipped": 0,
+            "cancelled": 0, "wasted": 0, "failed": 0, "tokens": 0, "wasted_tokens": 0
+        }
+    
+    def start(self, resume_id: str, resume_content: str, client: Optional[str] = None) -> List[str]:
+        """Start prefetching for a freshly uploaded resume, returning the kinds started
+        
+        client identifies the uploader (e.g. its address) for the per-client cap.
+        """
+        if not self.enabled:
+            return []
+        self._expire()
+        
+        started = []
+        for kind, runner in self.runners.items():
+            if self._running() >= self.max_total or (
+                client is not None and self.max_per_client and self._running(client) >= self.max_per_client
+            ):
+                self._record(kind, "skipped")
+                continue
+            entry = _Prefetch(client)
+            entry.task = asyncio.ensure_future(self._run(kind, entry, runner, resume_content))
+            entry.task.add_done_callback(lambda task, kind=kind, entry=entry: self._finished(kind, entry, task))
+            self._entries[(resume_id, kind)] = entry
+            self._record(kind, "started")
+            started.append(kind)
+        return started
+    
+    async def take(self, resume_id: Optional[str], kind: str) -> Optional[Dict]:
+        """Prefetched result for this resume, waiting for it if still running; None on a miss"""
+        if not self.enabled or not resume_id:
+            return None
+        self._expire()
+        
+        entry = self._entries.get((resume_id, kind))
+        if entry is None:
+            self._record(kind, "miss")
+            return None
+        
+        in_flight = not entry.task.done()
+        saved = (entry.finished_at or time.monotonic()) - entry.started_at
+        if in_flight:
+            # Someone is waiting now; the rest of the work should not queue behind batch jobs
+            await llm_scheduler.promote(entry.priority, PRIORITY_INTERACTIVE)
+        try:
+            # Shield so a disconnecting client does not cancel work others may attach to
+            result = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if not entry.task.cancelled():
+                raise
+            self._record(kind, "miss")
+            return None
+        except Exception:
+            # Already counted as failed; the caller runs the step itself
+            self._record(kind, "miss")
+            return None
+        
+        entry.hits += 1
+        self._record(kind, "hit")
+        if in_flight:
+            self._stats["in_flight_hits"] += 1
+        PREFETCH_SAVED_SECONDS.observe(saved, kind=kind)
+        return result
+    
+    def cancel(self, resume_id: str) -> None:
+        """Drop every prefetch for a resume, cancelling running ones"""
+        for key in [key for key in self._entries if key[0] == resume_id]:
+            self._discard(key)
+    
+    async def _run(
+        self, kind: str, entry: _Prefetch, runner: Callable[[str], Awaitable[Dict]], resume_content: str
+    ) -> Dict:
+        with endpoint_context(f"prefetch:{kind}"), llm_priority(entry.priority), collect_usage() as usage:
+            try:
+                return await runner(resume_content)
+            finally:
+                entry.finished_at = time.monotonic()
+                entry.tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+                self._stats["tokens"] += entry.tokens
+    
+    def _finished(self, kind: str, entry: _Prefetch, task: asyncio.Task) -> None:
+        self._trim()
+        if task.cancelled():
+            self._stats["wasted_tokens"] += entry.tokens
+        elif task.exception() is not None:
+            self._record(kind, "failed")
+            self._stats["wasted_tokens"] += entry.tokens
+            logger.warning("Prefetch %s failed: %s", kind, task.exception())
+    
+    def _discard(self, key: Tuple[str, str]) -> None:
+        """Forget a prefetch, counting it as cancelled if running or wasted if never used"""
+        entry = self._entries.pop(key)
+        if not entry.task.done():
+            # Its tokens are counted as wasted once the cancellation lands
+            entry.task.cancel()
+            self._record(key[1], "cancelled")
+        elif not entry.hits and not entry.task.cancelled() and entry.task.exception() is None:
+            self._record(key[1], "wasted")
+            self._stats["wasted_tokens"] += entry.tokens
+    
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for key in [key for key, entry in self._entries.items() if entry.started_at < cutoff]:
+            self._discard(key)
+    
+    def _trim(self) -> None:
+        """Drop the oldest finished results beyond max_stored"""
+        finished = [(entry.finished_at or 0.0, key) for key, entry in self._entries.items() if entry.task.done()]
+        if len(finished) > self.max_stored:
+            finished.sort()
+            for _, key in finished[:len(finished) - self.max_stored]:
+                self._discard(key)
+    
+    def _running(self, client: Optional[str] = None) -> int:
+        """Running prefetches, of one client when given"""
+        return sum(
+            1 for entry in self._entries.values()
+            if not entry.task.done() and (client is None or entry.client == client)
+        )
+    
+    def _record(self, kind: str, outcome: str) -> None:
+        self._stats[_OUTCOME_STATS.get(outcome, outcome)] += 1
+        PREFETCH_EVENTS.inc(kind=kind, outcome=outcome)
+    
+    def stats(self) -> Dict[str, float]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "running": self._running(),
+            "stored": len(self._entries),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+        }
+    
+    def close(self) -> None:
+        """Cancel every running prefetch"""
+        for entry in self._entries.values():
+            if not entry.task.done():
+                entry.task.cancel()
+        self._entries.clear()
@@ -0,0 +1,164 @@
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v ]+")
+# Explicit page numbers ("Page 2", "Page 2 of 3", "2 of 3"); bare numbers may be years and are kept
+_PAGE_MARKER = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+)$", re.IGNORECASE)
+
+
+@dataclass
+class CompactionResult:
+    """Compacted text with token counts before and after"""
+    text: str
+    tokens_before: int
+    tokens_after: int
+    truncated: bool = False
+    
+    def report(self) -> dict:
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "truncated": self.truncated
+        }
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(model: str):
+    """Load a tiktoken encoding, or None when tiktoken or its BPE files are unavailable"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use, which fails offline
+        logger.warning("Falling back to approximate token counts: %s", e)
+        return None
+
+
+def _edge_positions(lines: List[str]) -> Set[int]:
+    """Indexes of the first and last content lines of a page, where running headers and footers sit"""
+    filled = [index for index, line in enumerate(lines) if line and not _PAGE_MARKER.match(line)]
+    return {filled[0], filled[-1]} if filled else set()
+
+
+def _running_lines(pages: List[List[str]]) -> Set[str]:
+    """Lines found at the top or bottom of more than one page: running headers and footers"""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for page in pages:
+        counts.update({page[index] for index in _edge_positions(page)})
+    return {line for line, count in counts.items() if count > 1}
+
+
+def drop_running_lines(pages: List[str]) -> List[str]:
+    """Keep each running header or footer only where it first appears
+    
+    Called by the parser while page boundaries are still known; the same line
+    in the middle of a page is content and is kept.
+    """
+    lines = [page.splitlines() for page in pages]
+    normalized = [[_INLINE_WHITESPACE.sub(" ", line).strip() for line in page] for page in lines]
+    running = _running_lines(normalized)
+    if not running:
+        return pages
+    
+    emitted = set()
+    kept_pages = []
+    for page, keys in zip(lines, normalized):
+        edges = _edge_positions(keys)
+        kept = []
+        for position, (line, key) in enumerate(zip(page, keys)):
+            if position in edges and key in running:
+                if key in emitted:
+                    continue
+                emitted.add(key)
+            kept.append(line)
+        kept_pages.append("\n".join(kept))
+    return kept_pages
+
+
+class PromptCompactor:
+    """Shrinks resume text before it is embedded in prompts"""
+    
+    def __init__(self, model: str = "gpt-3.5-turbo", token_budget: Optional[int] = None):
+        self.model = model
+        # Resume tokens allowed per prompt; 0 disables trimming
+        self.token_budget = token_budget if token_budget is not None else int(
+            os.getenv("PROMPT_TOKEN_BUDGET", "3000")
+        )
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens locally, approximating ~4 characters per token without tiktoken"""
+        encoding = _load_encoding(self.model)
+        if encoding is None:
+            return math.ceil(len(text) / 4)
+        return len(encoding.encode(text, disallowed_special=()))
+    
+    def compact(self, text: str) -> CompactionResult:
+        """Collapse whitespace, drop page numbers and consecutive repeated lines, then trim to the budget
+        
+        Running headers and footers are removed earlier, by the parser (see drop_running_lines).
+        """
+        
+        tokens_before = self.count_tokens(text)
+        
+        lines = []
+        for line in text.splitlines():
+            line = _INLINE_WHITESPACE.sub(" ", line).strip()
+            if not line:
+                # Keep single blank lines as section separators
+                if lines and lines[-1]:
+                    lines.append("")
+                continue
+            if _PAGE_MARKER.match(line) or (lines and line == lines[-1]):
+                continue
+            lines.append(line)
+        
+        compacted = "\n".join(lines).strip()
+        tokens_after = self.count_tokens(compacted)
+        
+        truncated = False
+        if self.token_budget and tokens_after > self.token_budget:
+            compacted = self._truncate(compacted, self.token_budget)
+            tokens_after = self.count_tokens(compacted)
+            truncated = True
+        
+        result = CompactionResult(compacted, tokens_before, tokens_after, truncated)
+        logger.info(
+            "Compacted resume from %d to %d tokens%s",
+            tokens_before, tokens_after, " (truncated)" if truncated else ""
+        )
+        return result
+    
+    def _truncate(self, text: str, budget: int) -> str:
+        """Keep the leading text that fits within the budget, cutting at a line boundary"""
+        
+        marker = "\n[... resume truncated to fit the token budget ...]"
+        budget = max(1, budget - self.count_tokens(marker))
+        
+        encoding = _load_encoding(self.model)
+        if encoding is None:
+            head = text[:budget * 4]
+        else:
+            head = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+        
+        cut = head.rfind("\n")
+        if cut > len(head) // 2:
+            head = head[:cut]
+        
+        return head.rstrip() + marker
@@ -0,0 +1,143 @@
+import heapq
+import math
+import os
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+# Shared BM25 parameters keep index rankings consistent with the local ATS scorer
+from .ats_scorer import _BM25_B, _BM25_K1, job_terms, term_vector, tokenize
+
+
+class ResumeIndex:
+    """In-memory inverted index of parsed resumes for ranking them against a job description
+    
+    Each resume is stored once as a sparse vector of BM25-normalised term
+    weights in typed arrays; postings lists map term ids to (slot, weight)
+    arrays so a query only touches resumes that share a term with it.
+    """
+    
+    def __init__(self):
+        self.max_documents = int(os.getenv("RESUME_INDEX_MAX", "10000"))
+        self.average_length = int(os.getenv("ATS_AVERAGE_RESUME_TOKENS", "350"))
+        self._vocabulary: Dict[str, int] = {}
+        self._terms: List[str] = []
+        # Ids of terms whose last posting was removed, reused before the vocabulary grows
+        self._free_term_ids: List[int] = []
+        # term id -> slots and weights of the resumes containing it
+        self._posting_slots: Dict[int, array] = {}
+        self._posting_weights: Dict[int, array] = {}
+        # resume_id -> slot, oldest first for eviction
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._documents: Dict[int, Tuple[str, array, Dict]] = {}
+        self._next_slot = 0
+    
+    def add(self, resume_id: str, content: str, filename: str = "") -> None:
+        """Index (or re-index) a parsed resume under its resume_id"""
+        if resume_id in self._slots:
+            self.remove(resume_id)
+        while len(self._slots) >= self.max_documents:
+            self.remove(next(iter(self._slots)))
+        
+        tokens = tokenize(content)
+        length_norm = 1 - _BM25_B + _BM25_B * max(len(tokens), 1) / self.average_length
+        slot = self._next_slot
+        self._next_slot += 1
+        
+        term_ids = array("I")
+        for term, frequency in term_vector(tokens).items():
+            term_id = self._vocabulary.get(term)
+            if term_id is None:
+                if self._free_term_ids:
+                    term_id = self._free_term_ids.pop()
+                    self._terms[term_id] = term
+                else:
+                    term_id = len(self._terms)
+                    self._terms.append(term)
+                self._vocabulary[term] = term_id
+                self._posting_slots[term_id] = array("I")
+                self._posting_weights[term_id] = array("f")
+            self._posting_slots[term_id].append(slot)
+            self._posting_weights[term_id].append(
+                frequency * (_BM25_K1 + 1) / (frequency + _BM25_K1 * length_norm)
+            )
+            term_ids.append(term_id)
+        
+        self._slots[resume_id] = slot
+        self._documents[slot] = (resume_id, term_ids, {
+            "filename": filename,
+            "tokens": len(tokens),
+            "indexed_at": time.time()
+        })
+    
+    def remove(self, resume_id: str) -> bool:
+        """Drop a resume from the index; returns False if it was not indexed"""
+        slot = self._slots.pop(resume_id, None)
+        if slot is None:
+            return False
+        
+        _, term_ids, _ = self._documents.pop(slot)
+        for term_id in term_ids:
+            slots = self._posting_slots[term_id]
+            position = slots.index(slot)
+            del slots[position]
+            del self._posting_weights[term_id][position]
+            if not slots:
+                # Forget terms no indexed resume uses any more so memory tracks the live documents
+                del self._posting_slots[term_id]
+                del self._posting_weights[term_id]
+                del self._vocabulary[self._terms[term_id]]
+                self._terms[term_id] = ""
+                self._free_term_ids.append(term_id)
+        return True
+    
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self._slots
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def search(self, job_description: str, top_k: int = 10) -> List[Dict]:
+        """Top-K indexed resumes for a job description, best first"""
+        if not self._slots:
+            return []
+        
+        total = len(self._slots)
+        scores: Dict[int, float] = {}
+        query: List[Tuple[int, float]] = []
+        for term, weight in job_terms(job_description):
+            term_id = self._vocabulary.get(term)
+            if term_id is None:
+                continue
+            frequency = len(self._posting_slots[term_id])
+            idf = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            query.append((term_id, weight * idf))
+        
+        for term_id, query_weight in query:
+            for slot, weight in zip(self._posting_slots[term_id], self._posting_weights[term_id]):
+                scores[slot] = scores.get(slot, 0.0) + query_weight * weight
+        
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        query_terms = dict(query)
+        results = []
+        for slot, score in best:
+            resume_id, term_ids, metadata = self._documents[slot]
+            matched = [term_id for term_id in term_ids if term_id in query_terms]
+            matched.sort(key=lambda term_id: -query_terms[term_id])
+            results.append({
+                "resume_id": resume_id,
+                "filename": metadata["filename"],
+                "score": round(score, 4),
+                "matched_keywords": [self._terms[term_id] for term_id in matched[:10]]
+            })
+        return results
+    
+    def stats(self) -> Dict[str, int]:
+        postings = sum(len(slots) for slots in self._posting_slots.values())
+        return {
+            "documents": len(self._slots),
+            "terms": len(self._vocabulary),
+            "postings": postings,
+            # Typed arrays: 4-byte slot plus 4-byte weight per posting
+            "postings_bytes": postings * 8
+        }
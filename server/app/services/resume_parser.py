@@ -1,9 +1,222 @@
+import asyncio
+import hashlib
 import io
 import os
-from typing import Union
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial
+from typing import BinaryIO, List, Optional, Tuple, Union
 from fastapi import UploadFile
-import pdfplumber
-from docx import Document
+from .cache import LRUCache, SQLiteCache, TieredCache
+from .metrics import PDF_PAGE_SECONDS, observe_stage, track_stage
+from .prompt_compactor import drop_running_lines
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extraction output changes so cached text from older parsers is ignored
+PARSER_VERSION = "3"
+
+
+# Leading bytes that identify each supported format; PDFs may have a little junk
+# before the header, DOCX files are zip archives
+_MAGIC_BYTES = {
+    'pdf': b'%PDF-',
+    'docx': b'PK\x03\x04'
+}
+_PDF_HEADER_WINDOW = 1024
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+class ParserBusyError(Exception):
+    """Raised when the parsing pool has no room for another document"""
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_FILE_SIZE"""
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised when a file's extension or contents are not a supported format"""
+
+
+def _open_source(source: Union[bytes, str, BinaryIO]):
+    """Parsers accept in-memory bytes, a file path or an open binary file (read from the start)"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    if not isinstance(source, str):
+        source.seek(0)
+    return source
+
+
+def _read_upload(handle: BinaryIO, max_size: int, keep_up_to: Optional[int]) -> Tuple[Optional[bytes], str]:
+    """Hash an upload's file, also returning its bytes when it is at most keep_up_to bytes (None: always)"""
+    handle.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    while True:
+        chunk = handle.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLargeError(f"File exceeds the maximum size of {max_size} bytes")
+        digest.update(chunk)
+        if buffer is not None:
+            if keep_up_to is not None and size > keep_up_to:
+                buffer = None
+            else:
+                buffer.extend(chunk)
+    return (bytes(buffer) if buffer is not None else None), digest.hexdigest()
+
+
+# pdfplumber, pdfminer and python-docx take a noticeable share of worker boot
+# time, so they are imported on first parse (or by preload_parsers)
+def preload_parsers() -> None:
+    """Import the PDF and DOCX libraries ahead of the first upload"""
+    import docx  # noqa: F401
+    import pdfplumber  # noqa: F401
+    _plain_text_device_class()
+
+
+@lru_cache(maxsize=None)
+def _plain_text_device_class():
+    """Build the pdfminer device class on first use"""
+    from pdfminer.converter import PDFLayoutAnalyzer
+    from pdfminer.layout import LTChar, LTPage
+    
+    class _PlainTextDevice(PDFLayoutAnalyzer):
+        """pdfminer device that joins characters into lines in content-stream order"""
+        
+        def __init__(self, resource_manager):
+            super().__init__(resource_manager, laparams=None)
+            self.text = ""
+        
+        def receive_layout(self, ltpage: LTPage) -> None:
+            parts = []
+            previous = None
+            for item in ltpage:
+                if not isinstance(item, LTChar):
+                    continue
+                char = item.get_text()
+                if previous is not None:
+                    if abs(item.y0 - previous.y0) > max(item.height, previous.height) * 0.5:
+                        parts.append("\n")
+                    elif item.x0 - previous.x1 > item.width * 0.3 and char != " " and parts[-1] != " ":
+                        parts.append(" ")
+                parts.append(char)
+                previous = item
+            self.text = "".join(parts)
+    
+    return _PlainTextDevice
+
+
+def _extract_pdf_pages(content: Union[bytes, str, BinaryIO], start: int = 0, stop: Optional[int] = None,
+                       fast: bool = False, max_chars: int = 0) -> List[Tuple[int, str, float]]:
+    """Extract (page number, text, seconds) for pages[start:stop], stopping once max_chars is reached"""
+    return _extract_pdf_range(content, start, stop, fast, max_chars)[1]
+
+
+def _extract_pdf_range(content: Union[bytes, str, BinaryIO], start: int, stop: Optional[int], fast: bool,
+                       max_chars: int) -> Tuple[int, List[Tuple[int, str, float]]]:
+    """Page count of the whole PDF plus the extracted pages[start:stop], from a single open
+    
+    fast drives pdfminer directly and skips pdfplumber's per-character objects and
+    layout analysis; reading order follows the content stream.
+    """
+    try:
+        if fast:
+            return _extract_pdf_range_fast(content, start, stop, max_chars)
+        
+        import pdfplumber
+        
+        pages = []
+        total_chars = 0
+        pdf_file = _open_source(content)
+        
+        with pdfplumber.open(pdf_file) as pdf:
+            page_count = len(pdf.pages)
+            for number, page in enumerate(pdf.pages[start:stop], start=start):
+                started = time.perf_counter()
+                page_text = page.extract_text() or ""
+                # Release the page's parsed objects; long documents otherwise keep them all
+                page.flush_cache()
+                pages.append((number, page_text, time.perf_counter() - started))
+                
+                total_chars += len(page_text)
+                if max_chars and total_chars >= max_chars:
+                    break
+        
+        return page_count, pages
+    
+    except Exception as e:
+        raise Exception(f"Error parsing PDF: {str(e)}")
+
+
+def _extract_pdf_range_fast(content: Union[bytes, str, BinaryIO], start: int, stop: Optional[int],
+                            max_chars: int) -> Tuple[int, List[Tuple[int, str, float]]]:
+    """Text-only page extraction straight from pdfminer"""
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    
+    pages = []
+    total_chars = 0
+    resource_manager = PDFResourceManager()
+    device = _plain_text_device_class()(resource_manager)
+    interpreter = PDFPageInterpreter(resource_manager, device)
+    
+    pdf_file = _open_source(content)
+    # An upload's file belongs to the caller and stays open
+    with open(pdf_file, "rb") if isinstance(pdf_file, str) else nullcontext(pdf_file) as handle:
+        # Walking the page tree only reads page dictionaries; content streams are parsed below
+        all_pages = list(PDFPage.get_pages(handle))
+        for number, page in enumerate(all_pages[start:stop], start=start):
+            started = time.perf_counter()
+            interpreter.process_page(page)
+            pages.append((number, device.text, time.perf_counter() - started))
+            
+            total_chars += len(device.text)
+            if max_chars and total_chars >= max_chars:
+                break
+    
+    return len(all_pages), pages
+
+
+def _join_pdf_pages(pages: List[Tuple[int, str, float]], max_chars: int = 0) -> str:
+    """Join page texts in one pass, applying the character cap
+    
+    Running headers and footers are dropped here, the only place page boundaries
+    are known, so they do not repeat through the returned text.
+    """
+    text = "\n".join(drop_running_lines([page_text for _, page_text, _ in pages if page_text])).strip()
+    return text[:max_chars] if max_chars else text
+
+
+def _extract_pdf_text(content: Union[bytes, str, BinaryIO], max_pages: int = 0, max_chars: int = 0,
+                      fast: bool = False) -> str:
+    """Extract text from PDF using pdfplumber"""
+    pages = _extract_pdf_pages(content, 0, max_pages or None, fast, max_chars)
+    return _join_pdf_pages(pages, max_chars)
+
+
+def _extract_docx_text(content: Union[bytes, str, BinaryIO]) -> str:
+    """Extract text from DOCX using python-docx"""
+    from docx import Document
+    
+    try:
+        text = ""
+        docx_file = _open_source(content)
+        
+        doc = Document(docx_file)
+        for paragraph in doc.paragraphs:
+            text += paragraph.text + "\n"
+        
+        return text.strip()
+    
+    except Exception as e:
+        raise Exception(f"Error parsing DOCX: {str(e)}")
 
 
 class ResumeParser:
@@ -11,52 +224,232 @@ class ResumeParser:
     
     def __init__(self):
         self.supported_formats = ['.pdf', '.docx']
+        # Parsing is CPU-bound, so it runs off the event loop in a bounded pool.
+        # PARSER_EXECUTOR is one of "process", "thread" or "inline" (no pool).
+        self.executor_type = os.getenv("PARSER_EXECUTOR", "thread").lower()
+        self.max_workers = int(os.getenv("PARSER_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_queue = int(os.getenv("PARSER_MAX_QUEUE", "16"))
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self.max_file_size = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))
+        # Uploads larger than this are written to a temp file instead of kept in memory
+        self.spool_threshold = int(os.getenv("PARSER_SPOOL_THRESHOLD", str(1024 * 1024)))
+        # PDF extraction limits; long documents are split into page ranges that
+        # run in parallel (real parallelism needs PARSER_EXECUTOR=process)
+        self.pdf_max_pages = int(os.getenv("PDF_MAX_PAGES", "50"))
+        self.pdf_max_chars = int(os.getenv("PDF_MAX_CHARS", "100000"))
+        self.pdf_fast_text = os.getenv("PDF_FAST_TEXT", "false").lower() == "true"
+        self.pdf_pages_per_task = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+        # Extracted text is cached by content hash; PARSE_CACHE_PATH adds a SQLite
+        # tier that survives restarts
+        cache_path = os.getenv("PARSE_CACHE_PATH")
+        self.cache = TieredCache(
+            LRUCache(max_entries=int(os.getenv("PARSE_CACHE_SIZE", "256"))),
+            SQLiteCache(
+                cache_path,
+                namespace="parsed_text",
+                max_entries=int(os.getenv("PARSE_CACHE_DISK_SIZE", "10000"))
+            ) if cache_path else None
+        )
     
     async def parse_resume(self, file: UploadFile) -> str:
-        """Parse resume content from uploaded file"""
+        """Parse resume content from uploaded file
+        
+        Oversized files and files whose leading bytes do not match their extension
+        are rejected before the rest is read. The body is hashed in a worker thread,
+        off the event loop. Files beyond PARSER_SPOOL_THRESHOLD are parsed straight
+        from Starlette's spooled file instead of being read into memory or copied.
+        """
+        
+        extension = self._extension(file.filename)
+        read_started = time.perf_counter()
+        if file.size is not None and file.size > self.max_file_size:
+            raise UploadTooLargeError(f"File exceeds the maximum size of {self.max_file_size} bytes")
+        
+        head = await file.read(_READ_CHUNK_SIZE)
+        self._check_magic_bytes(extension, head)
+        
+        # Process workers cannot share the upload's file handle, so they always get the bytes
+        keep_up_to = None if self.executor_type == "process" else self.spool_threshold
+        loop = asyncio.get_running_loop()
+        content, digest = await loop.run_in_executor(
+            None, partial(_read_upload, file.file, self.max_file_size, keep_up_to)
+        )
+        observe_stage("upload_read", time.perf_counter() - read_started)
+        return await self._parse_source(file.file if content is None else content, extension, digest)
+    
+    async def parse_bytes(self, content: bytes, filename: str) -> str:
+        """Parse resume content from raw file bytes, using the extension to pick a parser"""
+        
+        extension = self._extension(filename)
+        self._check_magic_bytes(extension, content)
+        return await self._parse_source(content, extension, hashlib.sha256(content).hexdigest())
+    
+    async def _parse_source(self, source: Union[bytes, str, BinaryIO], extension: str, digest: str) -> str:
+        """Return cached text for the content hash, or run the matching parser"""
+        
+        cache_key = self._cache_key(extension, digest)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        with self._admission(), track_stage("parse"):
+            if extension == 'pdf':
+                text = await self._parse_pdf_source(source)
+            else:
+                text = await self._run_parser(_extract_docx_text, source)
+        
+        self.cache.set(cache_key, text)
+        return text
+    
+    async def _parse_pdf_source(self, source: Union[bytes, str, BinaryIO]) -> str:
+        """Extract PDF text, fanning page ranges out across the pool for long documents
+        
+        The first range also reports the page count, so short documents are opened
+        once. Later ranges share what is left of the character budget and are
+        cancelled once the pages before them have filled it.
+        """
+        
+        fast, max_chars = self.pdf_fast_text, self.pdf_max_chars
+        limit = self.pdf_max_pages or None
+        per_task = self.pdf_pages_per_task
+        if self.executor_type == "inline" or per_task <= 0 or not isinstance(source, (bytes, str)):
+            # Ranges would race on the position of a shared file handle
+            per_task = limit
+        first_stop = min(per_task, limit) if per_task and limit else per_task or limit
+        
+        page_count, pages = await self._run_parser(_extract_pdf_range, source, 0, first_stop, fast, max_chars)
+        if limit:
+            page_count = min(page_count, limit)
+        remaining = max_chars - sum(len(text) for _, text, _ in pages) if max_chars else 0
         
-        # Read file content
-        content = await file.read()
-        filename = file.filename.lower()
+        if first_stop is not None and page_count > first_stop and (not max_chars or remaining > 0):
+            tasks = [
+                asyncio.ensure_future(self._run_parser(
+                    _extract_pdf_pages, source, start, min(start + per_task, page_count), fast, remaining
+                ))
+                for start in range(first_stop, page_count, per_task)
+            ]
+            try:
+                for task in tasks:
+                    page_range = await task
+                    pages.extend(page_range)
+                    if max_chars:
+                        remaining -= sum(len(text) for _, text, _ in page_range)
+                        if remaining <= 0:
+                            break
+            finally:
+                # Ranges still queued for a worker are dropped; running ones finish unread
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                    elif not task.cancelled():
+                        task.exception()
         
+        self._report_page_timings(pages)
+        return _join_pdf_pages(pages, max_chars)
+    
+    def _report_page_timings(self, pages: List[Tuple[int, str, float]]) -> None:
+        """Record per-page extraction time"""
+        if not pages:
+            return
+        for _, _, seconds in pages:
+            PDF_PAGE_SECONDS.observe(seconds)
+        slowest = max(pages, key=lambda page: page[2])
+        logger.info(
+            "Extracted %d PDF pages in %.1f ms (slowest: page %d, %.1f ms)",
+            len(pages), sum(page[2] for page in pages) * 1000, slowest[0] + 1, slowest[2] * 1000
+        )
+        logger.debug("PDF page timings (ms): %s", [round(page[2] * 1000, 1) for page in pages])
+    
+    def _extension(self, filename: str) -> str:
+        """Map a filename to 'pdf' or 'docx'"""
+        filename = filename.lower()
         if filename.endswith('.pdf'):
-            return self._parse_pdf(content)
+            return 'pdf'
         elif filename.endswith('.docx'):
-            return self._parse_docx(content)
-        else:
-            raise ValueError("Unsupported file format")
+            return 'docx'
+        raise UnsupportedFormatError("Unsupported file format")
     
-    def _parse_pdf(self, content: bytes) -> str:
-        """Extract text from PDF using pdfplumber"""
+    def _check_magic_bytes(self, extension: str, head: bytes) -> None:
+        """Reject files whose leading bytes do not match their extension"""
+        magic = _MAGIC_BYTES[extension]
+        window = head[:_PDF_HEADER_WINDOW] if extension == 'pdf' else head[:len(magic)]
+        if magic not in window:
+            raise UnsupportedFormatError(f"File contents are not a valid {extension.upper()} document")
+    
+    def _cache_key(self, extension: str, digest: str) -> str:
+        """Content-addressed cache key, versioned by parser and extraction limits"""
+        if extension == 'pdf':
+            mode = "fast" if self.pdf_fast_text else "layout"
+            extension = f"pdf:{mode}:{self.pdf_max_pages}:{self.pdf_max_chars}"
+        return f"v{PARSER_VERSION}:{extension}:{digest}"
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the parsed-text cache"""
+        return self.cache.stats()
+    
+    @contextmanager
+    def _admission(self):
+        """Reserve a slot for one document, rejecting work when the pool is saturated"""
+        
+        # Documents already running plus those waiting for a worker
+        if self._in_flight >= self.max_workers + self.max_queue:
+            raise ParserBusyError("Resume parser is at capacity, please retry shortly")
+        
+        self._in_flight += 1
         try:
-            text = ""
-            pdf_file = io.BytesIO(content)
-            
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            return text.strip()
+            yield
+        finally:
+            self._in_flight -= 1
+    
+    async def _run_parser(self, func, *args):
+        """Run a parser function in the worker pool, or inline when no pool is configured"""
         
-        except Exception as e:
-            raise Exception(f"Error parsing PDF: {str(e)}")
+        if self.executor_type == "inline":
+            return func(*args)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), func, *args)
+    
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="resume-parser"
+                )
+            else:
+                raise ValueError(f"Unknown PARSER_EXECUTOR: {self.executor_type}")
+        return self._executor
+    
+    def warm_up(self) -> None:
+        """Load the parsing libraries and start the worker pool before traffic arrives"""
+        preload_parsers()
+        if self.executor_type == "inline":
+            return
+        executor = self._get_executor()
+        # Process workers import lazily too, so have each one preload
+        if self.executor_type == "process":
+            for future in [executor.submit(preload_parsers) for _ in range(self.max_workers)]:
+                future.result()
+    
+    def shutdown(self) -> None:
+        """Release the worker pool and cache storage"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.cache.close()
+    
+    def _parse_pdf(self, content: Union[bytes, str, BinaryIO]) -> str:
+        """Extract text from PDF using pdfplumber"""
+        return _extract_pdf_text(content, self.pdf_max_pages, self.pdf_max_chars, self.pdf_fast_text)
     
-    def _parse_docx(self, content: bytes) -> str:
+    def _parse_docx(self, content: Union[bytes, str, BinaryIO]) -> str:
         """Extract text from DOCX using python-docx"""
-        try:
-            text = ""
-            docx_file = io.BytesIO(content)
-            
-            doc = Document(docx_file)
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            return text.strip()
-        
-        except Exception as e:
-            raise Exception(f"Error parsing DOCX: {str(e)}")
+        return _extract_docx_text(content)
     
     def validate_file_format(self, filename: str) -> bool:
         """Validate if file format is supported"""
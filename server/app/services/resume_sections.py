@@ -0,0 +1,93 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Heading keywords for the sections that are analyzed separately
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "objective", "about me"),
+    "experience": ("experience", "employment", "work history", "career history"),
+    "education": ("education", "academic", "qualifications"),
+    "skills": ("skills", "technologies", "technical proficiencies", "competencies", "tech stack")
+}
+
+# Headings that start a section of their own but are grouped under "other"
+OTHER_HEADINGS = (
+    "projects", "certifications", "certificates", "awards", "achievements", "publications",
+    "languages", "interests", "volunteer", "volunteering", "references", "courses", "training", "activities",
+    "project", "certification", "award", "honors"
+)
+
+# Text before the first heading is treated as the contact block
+SECTION_ORDER = ("contact", "summary", "experience", "education", "skills", "other")
+
+_WHITESPACE = re.compile(r"\s+")
+_NON_LETTERS = re.compile(r"[^a-z&]+")
+_HEADING_MAX_WORDS = 4
+# Words that may surround a keyword in a heading ("Professional Experience", "Skills & Tools")
+_HEADING_QUALIFIERS = {
+    "professional", "work", "relevant", "technical", "key", "core", "career", "additional", "selected",
+    "personal", "other", "recent", "industry", "background", "highlights", "details", "tools", "and", "&", "of", "my"
+}
+# (keyword, section) pairs, longest first so "work history" wins over a bare qualifier
+_HEADING_KEYWORDS = sorted(
+    [(keyword, section) for section, keywords in SECTION_HEADINGS.items() for keyword in keywords]
+    + [(keyword, "other") for keyword in OTHER_HEADINGS],
+    key=lambda item: -len(item[0])
+)
+
+
+@dataclass
+class ResumeSection:
+    """One segment of a resume and the fingerprint of its normalized text"""
+    name: str
+    text: str
+    
+    @property
+    def fingerprint(self) -> str:
+        normalized = _WHITESPACE.sub(" ", self.text).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def classify_heading(line: str) -> Optional[str]:
+    """Section name for a heading line, or None for body text
+    
+    A heading is a keyword phrase plus at most a few qualifier words. Lines with
+    anything else on them ("Tech stack: Go, Kafka", "Experience with Python")
+    are body text.
+    """
+    heading = line.strip().strip(":#*-=_|").strip().lower()
+    # Headings are a few words without sentence punctuation or a "label: value" pair
+    if not heading or heading.endswith(".") or ":" in heading or len(heading.split()) > _HEADING_MAX_WORDS:
+        return None
+    
+    rest = f" {_NON_LETTERS.sub(' ', heading).strip()} "
+    matches = []
+    for keyword, section in _HEADING_KEYWORDS:
+        position = rest.find(f" {keyword} ")
+        if position >= 0:
+            matches.append((position, section))
+            # Blank the phrase out in place so positions of later matches still compare
+            rest = rest[:position] + " " * (len(keyword) + 2) + rest[position + len(keyword) + 2:]
+    if not matches or any(word not in _HEADING_QUALIFIERS for word in rest.split()):
+        return None
+    # "Education & Certifications" belongs to the section named first
+    return min(matches)[1]
+
+
+def segment_resume(text: str) -> List[ResumeSection]:
+    """Split resume text into sections in SECTION_ORDER, merging repeated headings"""
+    lines: Dict[str, List[str]] = {}
+    current = "contact"
+    for line in text.splitlines():
+        section = classify_heading(line)
+        if section is not None:
+            current = section
+        lines.setdefault(current, []).append(line)
+    
+    sections = []
+    for name in SECTION_ORDER:
+        body = "\n".join(lines.get(name, [])).strip()
+        if body:
+            sections.append(ResumeSection(name, body))
+    return sections
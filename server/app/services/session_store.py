@@ -0,0 +1,51 @@
+import os
+import time
+import uuid
+from typing import Dict, Optional
+from .cache import LRUCache, SQLiteCache, TieredCache
+
+
+class ResumeSessionStore:
+    """Keeps parsed resume text server-side so clients can refer to it by id"""
+    
+    def __init__(self):
+        self.ttl = float(os.getenv("RESUME_SESSION_TTL", "3600"))
+        max_entries = int(os.getenv("RESUME_SESSION_MAX", "1000"))
+        backend = os.getenv("RESUME_SESSION_BACKEND", "memory").lower()
+        
+        disk = None
+        if backend == "sqlite":
+            disk = SQLiteCache(
+                os.getenv("RESUME_SESSION_PATH", "./cache/resume_sessions.sqlite3"),
+                namespace="resume_sessions",
+                max_entries=int(os.getenv("RESUME_SESSION_DISK_MAX", "100000")),
+                ttl=self.ttl
+            )
+        elif backend != "memory":
+            raise ValueError(f"Unknown RESUME_SESSION_BACKEND: {backend}")
+        
+        self.store = TieredCache(LRUCache(max_entries=max_entries, ttl=self.ttl), disk)
+    
+    def create(self, content: str, filename: str) -> str:
+        """Store parsed resume text and return its new resume_id"""
+        resume_id = uuid.uuid4().hex
+        self.store.set(resume_id, {
+            "content": content,
+            "filename": filename,
+            "created_at": time.time()
+        })
+        return resume_id
+    
+    def get(self, resume_id: str) -> Optional[Dict]:
+        """Return the session, or None if unknown or expired"""
+        return self.store.get(resume_id)
+    
+    def delete(self, resume_id: str) -> None:
+        """Forget a session"""
+        self.store.delete(resume_id)
+    
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats()
+    
+    def close(self) -> None:
+        self.store.close()
@@ -0,0 +1,3 @@
+"""
+Benchmarks and local test harnesses for the Resume Reviewer API
+"""
@@ -0,0 +1,108 @@
+"""
+Measure re-analysis after a one-line edit, whole-resume vs incremental.
+
+Each generated resume is analyzed once, one experience bullet is edited and
+the resume is analyzed again. In whole-resume mode the edit misses the cache
+and the full resume is re-sent; in incremental mode only the changed section
+is. Latency, calls and tokens are reported for both passes:
+
+    python -m benchmarks.bench_incremental --resumes 20 --llm-latency 0.3 --tokens-per-second 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from .corpus import JOB_DESCRIPTIONS, build_resume_lines
+from .load_test import start_fake_openai, wait_for_port
+from .report import add_baseline_arguments, check_baseline, print_table, summarize
+
+
+def edit_one_bullet(text: str, rng: random.Random) -> str:
+    """Append a few words to one experience bullet"""
+    lines = text.splitlines()
+    bullets = [index for index, line in enumerate(lines) if line.startswith("- ")]
+    index = rng.choice(bullets)
+    lines[index] += ", cutting costs by 20%"
+    return "\n".join(lines)
+
+
+async def run_pass(analyzer, resumes, job_description: str, concurrency: int):
+    """Analyze every resume, returning latencies, wall time and summed usage"""
+    from app.services.metrics import collect_usage
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    
+    async def one(text):
+        async with semaphore:
+            with collect_usage() as usage:
+                started = time.perf_counter()
+                await analyzer.analyze_resume(text, job_description)
+                latencies.append(time.perf_counter() - started)
+            for key in totals:
+                totals[key] += usage[key]
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in resumes))
+    return latencies, time.perf_counter() - started, totals
+
+
+async def run(args) -> int:
+    fake = start_fake_openai(args.fake_port, args.llm_latency, args.tokens_per_second)
+    try:
+        await wait_for_port(f"http://127.0.0.1:{args.fake_port}/docs")
+        os.environ["OPENAI_API_KEY"] = "benchmark"
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}/v1"
+        os.environ["LLM_CACHE_BACKEND"] = "memory"
+        from app.services.ai_analyzer import AIAnalyzer
+        from app.services.openai_client import openai_clients
+        
+        rng = random.Random(args.seed)
+        resumes = ["\n".join(build_resume_lines(rng, rng.randint(2, 5))) for _ in range(args.resumes)]
+        edited = [edit_one_bullet(text, rng) for text in resumes]
+        job_description = JOB_DESCRIPTIONS[0]
+        
+        results, usage = {}, {}
+        for mode in ("whole", "incremental"):
+            # A fresh analyzer per mode so neither run sees the other's cache
+            analyzer = AIAnalyzer()
+            analyzer.structured_output = True
+            analyzer.incremental = mode == "incremental"
+            for label, texts in (("first", resumes), ("edited", edited)):
+                latencies, elapsed, totals = await run_pass(analyzer, texts, job_description, args.concurrency)
+                results[f"{mode}_{label}"] = summarize(latencies, elapsed)
+                usage[f"{mode}_{label}"] = totals
+        await openai_clients.close()
+    finally:
+        fake.terminate()
+        fake.wait()
+    
+    print_table(results)
+    print(f"\n{'pass':<20} {'calls':>8} {'prompt tok':>12} {'completion tok':>15}   (per resume)")
+    for name, totals in usage.items():
+        count = max(1, args.resumes)
+        print(
+            f"{name:<20} {totals['calls'] / count:>8.2f} {totals['prompt_tokens'] / count:>12.0f} "
+            f"{totals['completion_tokens'] / count:>15.0f}"
+        )
+    return check_baseline(args, results, {"usage": usage})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--fake-port", type=int, default=9122)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Compare LinkedIn generation modes: four section calls vs one combined call.
+
+Runs LinkedInOptimizer.optimize_profile over generated resumes in both
+modes against the fake OpenAI server and reports latency, calls and
+prompt/completion tokens per profile. A warm-up pass runs first and the
+order of the modes alternates between rounds, so cold-start costs do not
+land on whichever mode happens to run first:
+
+    python -m benchmarks.bench_linkedin_modes --profiles 20 --rounds 2 --llm-latency 0.3 --tokens-per-second 300
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from .corpus import generate_corpus
+from .load_test import start_fake_openai, wait_for_port
+from .report import add_baseline_arguments, check_baseline, print_table, summarize
+
+
+async def run_mode(optimizer, resumes, mode: str, concurrency: int):
+    """Optimize every resume in the given mode, returning latencies and summed usage"""
+    optimizer.mode = mode
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "retried_sections": 0}
+    
+    async def one(text):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await optimizer.optimize_profile(text)
+            latencies.append(time.perf_counter() - started)
+            generation = result["generation"]
+            for key in ("calls", "prompt_tokens", "completion_tokens"):
+                totals[key] += generation[key]
+            totals["retried_sections"] += len(generation["retried_sections"])
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in resumes))
+    return latencies, time.perf_counter() - started, totals
+
+
+async def run(args) -> int:
+    fake = start_fake_openai(args.fake_port, args.llm_latency, args.tokens_per_second)
+    try:
+        await wait_for_port(f"http://127.0.0.1:{args.fake_port}/docs")
+        os.environ["OPENAI_API_KEY"] = "benchmark"
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}/v1"
+        from app.services.linkedin_optimizer import LinkedInOptimizer
+        from app.services.openai_client import openai_clients
+        from app.services.resume_parser import _extract_docx_text, _extract_pdf_text
+        
+        resumes = [
+            _extract_pdf_text(content) if name.endswith(".pdf") else _extract_docx_text(content)
+            for name, content in generate_corpus(args.profiles, args.seed)
+        ]
+        optimizer = LinkedInOptimizer()
+        modes = ("sections", "combined")
+        for mode in modes:
+            await run_mode(optimizer, resumes[:args.warmup], mode, args.concurrency)
+        
+        samples = {mode: ([], 0.0) for mode in modes}
+        usage = {mode: {} for mode in modes}
+        for round_index in range(args.rounds):
+            for mode in (modes if round_index % 2 == 0 else modes[::-1]):
+                latencies, elapsed, totals = await run_mode(optimizer, resumes, mode, args.concurrency)
+                samples[mode] = (samples[mode][0] + latencies, samples[mode][1] + elapsed)
+                for key, value in totals.items():
+                    usage[mode][key] = usage[mode].get(key, 0) + value
+        results = {f"linkedin_{mode}": summarize(*samples[mode]) for mode in modes}
+        await openai_clients.close()
+    finally:
+        fake.terminate()
+        fake.wait()
+    
+    print_table(results)
+    print(f"\n{'mode':<12} {'calls':>8} {'prompt tok':>12} {'completion tok':>15} {'retried':>8}   (per profile)")
+    for mode, totals in usage.items():
+        count = max(1, args.profiles * args.rounds)
+        print(
+            f"{mode:<12} {totals['calls'] / count:>8.2f} {totals['prompt_tokens'] / count:>12.0f} "
+            f"{totals['completion_tokens'] / count:>15.0f} {totals['retried_sections'] / count:>8.2f}"
+        )
+    sections, combined = results["linkedin_sections"]["p50_ms"], results["linkedin_combined"]["p50_ms"]
+    print(f"\ncombined p50 is {(combined - sections) / sections:+.0%} vs sections")
+    return check_baseline(args, results, {"usage": usage})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=2, help="timed passes per mode, alternating the order")
+    parser.add_argument("--warmup", type=int, default=3, help="profiles per mode run untimed first")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--fake-port", type=int, default=9101)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmarks for resume parsing and analysis post-processing.
+
+Times ResumeParser._parse_pdf, ResumeParser._parse_docx,
+AIAnalyzer._parse_analysis_response and the local ATS scorer over a
+generated corpus:
+
+    python -m benchmarks.bench_parsers --count 40
+    python -m benchmarks.bench_parsers --save-baseline benchmarks/baselines/parsers.json
+    python -m benchmarks.bench_parsers --baseline benchmarks/baselines/parsers.json
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.services.ai_analyzer import AIAnalyzer
+from app.services.resume_parser import ResumeParser
+from .bench_analysis_parser import build_analysis
+from .corpus import JOB_DESCRIPTIONS, generate_corpus
+from .fake_openai import CANNED_ANALYSIS
+from .report import add_baseline_arguments, check_baseline, peak_rss_mb, print_table, summarize
+
+
+def time_calls(func, inputs, repeat: int):
+    """Call func once per input, repeat times, and return per-call durations"""
+    samples = []
+    for _ in range(repeat):
+        for value in inputs:
+            started = time.perf_counter()
+            func(value)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=40, help="number of generated resumes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+    
+    resume_parser = ResumeParser()
+    analyzer = AIAnalyzer()
+    corpus = generate_corpus(args.count, args.seed)
+    pdfs = [content for name, content in corpus if name.endswith(".pdf")]
+    docxs = [content for name, content in corpus if name.endswith(".docx")]
+    analyses = [CANNED_ANALYSIS] + [build_analysis(size, seed) for seed, size in enumerate((50, 200, 1000))]
+    
+    # Warm imports and lazily built structures before timing
+    resume_parser._parse_pdf(pdfs[0])
+    resume_parser._parse_docx(docxs[0])
+    
+    results = {
+        "parse_pdf": summarize(time_calls(resume_parser._parse_pdf, pdfs, args.repeat)),
+        "parse_docx": summarize(time_calls(resume_parser._parse_docx, docxs, args.repeat)),
+        "parse_analysis_response": summarize(
+            time_calls(analyzer._parse_analysis_response, analyses, args.repeat * 50)
+        ),
+    }
+    texts = [resume_parser._parse_pdf(content) for content in pdfs]
+    results["ats_score"] = summarize(time_calls(
+        lambda text: analyzer.ats_scorer.score(text, JOB_DESCRIPTIONS[len(text) % len(JOB_DESCRIPTIONS)]),
+        texts, args.repeat * 10
+    ))
+    print_table(results)
+    print(f"peak RSS: {peak_rss_mb():.1f} MiB")
+    
+    resume_parser.shutdown()
+    sys.exit(check_baseline(args, results, {"corpus": {"count": args.count, "seed": args.seed}}))
+
+
+if __name__ == "__main__":
+    main()
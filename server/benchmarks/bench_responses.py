@@ -0,0 +1,141 @@
+"""
+Measure response serialization time and bytes on the wire.
+
+Collects real response bodies from the in-process app (upload, analysis,
+LinkedIn, a finished job and /stats) against a local fake OpenAI server, then
+times the stdlib JSONResponse against FastJSONResponse on each and reports
+body sizes uncompressed, gzip- and (when installed) brotli-compressed, plus
+the bytes of a conditional GET answered with 304:
+
+    python -m benchmarks.bench_responses --resumes 10 --repeat 2000
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+import time
+from typing import Dict, List
+
+from .corpus import JOB_DESCRIPTIONS, generate_corpus
+from .load_test import start_fake_openai, wait_for_port
+from .report import add_baseline_arguments, check_baseline, print_table, summarize
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+async def collect_payloads(client, corpus) -> Dict[str, List[dict]]:
+    """Response bodies of each endpoint kind, uncompressed"""
+    headers = {"Accept-Encoding": "identity"}
+    payloads: Dict[str, List[dict]] = {"upload": [], "analyze": [], "linkedin": [], "job": [], "stats": []}
+    for index, (filename, content) in enumerate(corpus):
+        upload = (await client.post("/upload-resume", files={"file": (filename, content)}, headers=headers)).json()
+        payloads["upload"].append(upload)
+        body = {"resume_id": upload["resume_id"]}
+        analysis = await client.post("/analyze", json={
+            **body, "job_description": JOB_DESCRIPTIONS[index % len(JOB_DESCRIPTIONS)]
+        }, headers=headers)
+        payloads["analyze"].append(analysis.json())
+        payloads["linkedin"].append((await client.post("/linkedin", json=body, headers=headers)).json())
+        job = (await client.post("/jobs/linkedin", json=body, headers=headers)).json()["job"]
+        finished = await client.get(f"/jobs/{job['job_id']}", params={"wait": 30}, headers=headers)
+        payloads["job"].append(finished.json())
+    payloads["stats"].append((await client.get("/stats", headers=headers)).json())
+    return payloads
+
+
+def time_render(response_class, payloads: List[dict], repeat: int) -> List[float]:
+    """Seconds per render of each payload, repeated"""
+    samples = []
+    for _ in range(repeat):
+        for payload in payloads:
+            started = time.perf_counter()
+            response_class(content=payload)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def conditional_get_bytes(client, job_id: str) -> Dict[str, int]:
+    """Bytes downloaded polling a finished job: plain, gzip and revalidated with its ETag"""
+    url = f"/jobs/{job_id}"
+    plain = await client.get(url, headers={"Accept-Encoding": "identity"})
+    compressed = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    revalidated = await client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert revalidated.status_code == 304, revalidated.status_code
+    return {
+        "plain": plain.num_bytes_downloaded,
+        "gzip": compressed.num_bytes_downloaded,
+        "not_modified": revalidated.num_bytes_downloaded
+    }
+
+
+async def run(args) -> int:
+    fake = start_fake_openai(args.fake_port, args.llm_latency, 0)
+    try:
+        await wait_for_port(f"http://127.0.0.1:{args.fake_port}/docs")
+        os.environ.update(
+            OPENAI_API_KEY="benchmark",
+            OPENAI_BASE_URL=f"http://127.0.0.1:{args.fake_port}/v1",
+            LLM_CACHE_BACKEND="none"
+        )
+        import httpx
+        from fastapi.responses import JSONResponse
+        from app.main import app
+        from app.responses import FastJSONResponse, orjson
+        
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                payloads = await collect_payloads(client, generate_corpus(args.resumes, args.seed))
+                job_id = payloads["job"][-1]["job"]["job_id"]
+                polling = await conditional_get_bytes(client, job_id)
+    finally:
+        fake.terminate()
+        fake.wait()
+    
+    results = {}
+    sizes = {}
+    for kind, items in payloads.items():
+        results[f"{kind} stdlib"] = summarize(time_render(JSONResponse, items, args.repeat))
+        results[f"{kind} fast"] = summarize(time_render(FastJSONResponse, items, args.repeat))
+        stdlib_bytes = sum(len(JSONResponse(content=item).body) for item in items) / len(items)
+        bodies = [FastJSONResponse(content=item).body for item in items]
+        sizes[kind] = {
+            "stdlib": stdlib_bytes,
+            "fast": sum(map(len, bodies)) / len(bodies),
+            "gzip": sum(len(gzip.compress(body, compresslevel=args.gzip_level)) for body in bodies) / len(bodies),
+            "br": sum(len(brotli.compress(body, quality=args.brotli_quality)) for body in bodies) / len(bodies)
+            if brotli is not None else None
+        }
+    
+    print(f"encoder: {'orjson' if orjson is not None else 'stdlib (orjson not installed)'}; render time per body")
+    print_table(results)
+    print()
+    print(f"{'payload':<12} {'stdlib B':>10} {'fast B':>10} {'gzip B':>10} {'br B':>10} {'speedup':>8}")
+    for kind, size in sizes.items():
+        speedup = results[f"{kind} stdlib"]["p50_ms"] / max(results[f"{kind} fast"]["p50_ms"], 1e-9)
+        br = f"{size['br']:>10.0f}" if size["br"] is not None else f"{'-':>10}"
+        print(f"{kind:<12} {size['stdlib']:>10.0f} {size['fast']:>10.0f} {size['gzip']:>10.0f} {br} {speedup:>7.1f}x")
+    print()
+    print("GET /jobs/{id} downloaded bytes: " + ", ".join(f"{key}={value}" for key, value in polling.items()))
+    return check_baseline(args, results, {"bytes": sizes, "job_polling_bytes": polling})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1000, help="renders of each payload per encoder")
+    parser.add_argument("--llm-latency", type=float, default=0.01)
+    parser.add_argument("--gzip-level", type=int, default=int(os.getenv("GZIP_LEVEL", "6")))
+    parser.add_argument("--brotli-quality", type=int, default=int(os.getenv("BROTLI_QUALITY", "4")))
+    parser.add_argument("--fake-port", type=int, default=9150)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Exercise model routing against two local fake endpoints.
+
+Starts a fast endpoint that fails a share of requests and a slower, reliable
+one, points LLM_ENDPOINTS at both and runs LinkedIn generation and
+incremental analyses through the router with distinct small and large models.
+Reports latency, where calls were routed (and why) and the router's view of
+each endpoint:
+
+    python -m benchmarks.bench_routing --profiles 20 --fast-error-rate 0.2 --invalid-small
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from .corpus import JOB_DESCRIPTIONS, generate_corpus
+from .load_test import start_fake_openai, wait_for_port
+from .report import add_baseline_arguments, check_baseline, print_table, summarize
+
+
+async def timed(items, run, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    
+    async def one(item):
+        async with semaphore:
+            started = time.perf_counter()
+            await run(item)
+            latencies.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(one(item) for item in items))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run(args) -> int:
+    fast_port, slow_port = args.fake_port, args.fake_port + 1
+    small_model, large_model = "gpt-4o-mini", "gpt-4o"
+    invalid = {"FAKE_OPENAI_INVALID_MODELS": small_model} if args.invalid_small else {}
+    servers = [
+        start_fake_openai(fast_port, args.llm_latency, args.tokens_per_second,
+                          FAKE_OPENAI_ERROR_RATE=str(args.fast_error_rate), **invalid),
+        start_fake_openai(slow_port, args.llm_latency * args.slow_factor, args.tokens_per_second, **invalid)
+    ]
+    try:
+        for port in (fast_port, slow_port):
+            await wait_for_port(f"http://127.0.0.1:{port}/docs")
+        os.environ.update(
+            OPENAI_API_KEY="benchmark",
+            LLM_ENDPOINTS=f"fast=http://127.0.0.1:{fast_port}/v1,slow=http://127.0.0.1:{slow_port}/v1",
+            LLM_SMALL_MODEL=small_model,
+            LLM_LARGE_MODEL=large_model,
+            LLM_CACHE_BACKEND="none",
+            LLM_BACKOFF_BASE="0.05"
+        )
+        from app.services.ai_analyzer import AIAnalyzer
+        from app.services.linkedin_optimizer import LinkedInOptimizer
+        from app.services.metrics import metrics
+        from app.services.model_router import model_router
+        from app.services.openai_client import openai_clients
+        from app.services.resume_parser import _extract_docx_text, _extract_pdf_text
+        
+        resumes = [
+            _extract_pdf_text(content) if name.endswith(".pdf") else _extract_docx_text(content)
+            for name, content in generate_corpus(args.profiles, args.seed)
+        ]
+        optimizer = LinkedInOptimizer()
+        analyzer = AIAnalyzer()
+        analyzer.structured_output = True
+        analyzer.incremental = True
+        
+        results = {
+            "linkedin": await timed(resumes, optimizer.optimize_profile, args.concurrency),
+            "analysis": await timed(
+                resumes, lambda text: analyzer.analyze_resume(text, JOB_DESCRIPTIONS[0]), args.concurrency
+            )
+        }
+        router_stats = model_router.stats()
+        routes = [
+            line for line in metrics.render().splitlines()
+            if line.startswith("resume_reviewer_llm_route_total") or line.startswith("resume_reviewer_llm_cost_usd_total")
+        ]
+        await openai_clients.close()
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+    
+    print_table(results)
+    print()
+    print("\n".join(routes))
+    print()
+    for key, value in router_stats.items():
+        print(f"{key:<24} {value}")
+    return check_baseline(args, results, {"router": router_stats})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--slow-factor", type=float, default=3.0, help="latency multiplier of the slow endpoint")
+    parser.add_argument("--tokens-per-second", type=float, default=0)
+    parser.add_argument("--fast-error-rate", type=float, default=0.2)
+    parser.add_argument("--invalid-small", action="store_true", help="small model returns unusable JSON")
+    parser.add_argument("--fake-port", type=int, default=9130)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
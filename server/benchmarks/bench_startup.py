@@ -0,0 +1,113 @@
+"""
+Measure API cold start: import time, startup and the first requests.
+
+Each run is a fresh interpreter that imports app.main, runs the lifespan
+startup and serves /health and a first /ats-score request in-process, with
+and without STARTUP_WARMUP. The slowest imports (from `python -X importtime`)
+are listed so regressions can be traced to a module:
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .report import add_baseline_arguments, check_baseline, print_table, summarize
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter for every run
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with app.main.app.router.lifespan_context(app.main.app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.get("/health")).raise_for_status()
+            health = time.perf_counter()
+            response = await client.post("/ats-score", json={
+                "resume_content": "Python developer with FastAPI, Docker and AWS experience",
+                "job_description": "Backend engineer: Python, FastAPI, PostgreSQL, Kubernetes"
+            })
+            response.raise_for_status()
+            first = time.perf_counter()
+    print(json.dumps({
+        "import": imported - started,
+        "ready": ready - started,
+        "health": health - started,
+        "first_request": first - ready,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def child_env(warmup: bool) -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env["PYTHONPATH"] = SERVER_DIR
+    env["STARTUP_WARMUP"] = "true" if warmup else "false"
+    # Keep sqlite-backed stores and the job queue in memory so runs do not share state
+    env["JOB_BACKEND"] = "memory"
+    return env
+
+
+def run_once(warmup: bool) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=SERVER_DIR, env=child_env(warmup),
+        capture_output=True, text=True, check=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def slowest_imports(top: int) -> list:
+    """(cumulative seconds, module) for the slowest imports of app.main"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=SERVER_DIR,
+        env=child_env(False), capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+    
+    results = {}
+    for warmup in (False, True):
+        runs = [run_once(warmup) for _ in range(args.runs)]
+        label = "warmup" if warmup else "lazy"
+        for key in ("import", "ready", "health", "first_request", "process"):
+            results[f"{label}_{key}"] = summarize([run[key] for run in runs])
+    
+    print_table(results)
+    if args.top:
+        print(f"\n{'cumulative ms':>14}  module")
+        for seconds, module in slowest_imports(args.top):
+            print(f"{seconds * 1000:>14.1f}  {module}")
+    sys.exit(check_baseline(args, results))
+
+
+if __name__ == "__main__":
+    main()
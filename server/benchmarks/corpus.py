@@ -0,0 +1,167 @@
+"""
+Deterministic corpus of synthetic resumes for benchmarks and load tests.
+
+The same seed always produces byte-identical PDF and DOCX files, so runs
+on different days are comparable. Write a corpus to disk with:
+
+    python -m benchmarks.corpus --count 20 --out /tmp/resumes
+"""
+import argparse
+import io
+import os
+import random
+import zipfile
+from datetime import datetime
+from typing import List, Tuple
+from docx import Document
+
+FIXED_TIMESTAMP = datetime(2024, 1, 1)
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Perera", "Silva", "Fernando", "Smith", "Garcia", "Chen", "Khan", "Novak", "Okafor", "Larsen"]
+TITLES = [
+    "Senior Software Engineer", "Backend Developer", "Data Engineer", "Full Stack Developer",
+    "DevOps Engineer", "Machine Learning Engineer", "Frontend Developer", "Platform Engineer"
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "Terraform", "AWS",
+    "GCP", "React", "TypeScript", "Node.js", "Kafka", "Spark", "Airflow", "Go", "Java", "GraphQL",
+    "CI/CD", "Prometheus", "Grafana", "Pandas", "PyTorch", "scikit-learn", "Linux", "Git", "REST APIs"
+]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Delivered", "Scaled", "Reduced"]
+OBJECTS = [
+    "a payments API handling 2M requests per day", "the CI pipeline cutting build time by 40%",
+    "an event-driven ingestion service on Kafka", "the monolith into twelve microservices",
+    "dashboards and alerting for on-call engineers", "a recommendation model lifting CTR by 8%",
+    "infrastructure as code for three environments", "the onboarding flow used by 50k customers"
+]
+
+JOB_DESCRIPTIONS = [
+    "We are hiring a Senior Python Engineer with FastAPI, PostgreSQL, Docker and AWS experience "
+    "to build scalable REST APIs and mentor a small team.",
+    "Data Engineer needed: Spark, Airflow, Kafka and Python. You will own batch and streaming "
+    "pipelines and data quality monitoring.",
+    "Platform Engineer to run Kubernetes, Terraform and CI/CD for a growing product organisation, "
+    "with strong Linux and observability skills (Prometheus, Grafana).",
+    "Full Stack Developer with React, TypeScript and Node.js to ship customer-facing features "
+    "end to end in a fast-moving startup."
+]
+
+
+def build_resume_lines(rng: random.Random, roles: int) -> List[str]:
+    """Build the plain-text lines of one resume with the given number of roles"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+    lines = [
+        name,
+        f"{title} | {name.split()[0].lower()}@example.com | +94 77 123 4567",
+        "",
+        "SUMMARY",
+        f"{title} with {rng.randint(2, 15)} years of experience building reliable, well-tested software.",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 10)),
+        "",
+        "EXPERIENCE",
+    ]
+    for index in range(roles):
+        start = 2024 - 2 * (index + 1)
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({start} - {start + 2})")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}")
+        lines.append("")
+    lines.extend([
+        "EDUCATION",
+        "BSc (Hons) in Computer Science - University of Moratuwa",
+        "",
+        "CERTIFICATIONS",
+        "AWS Certified Solutions Architect - Associate",
+    ])
+    return lines
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: List[str], lines_per_page: int = 55) -> bytes:
+    """Render lines into a minimal multi-page PDF using the built-in Helvetica font"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+    ]
+    for index, page in enumerate(pages):
+        stream = "BT /F1 10 Tf 50 770 Td 13 TL " + " ".join(f"({_pdf_escape(line)}) '" for line in page) + " ET"
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * index} 0 R >>"
+        ).encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def make_docx(lines: List[str]) -> bytes:
+    """Render lines into a DOCX document, one paragraph per line"""
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.core_properties.created = FIXED_TIMESTAMP
+    document.core_properties.modified = FIXED_TIMESTAMP
+    buffer = io.BytesIO()
+    document.save(buffer)
+    
+    # Zip member timestamps default to "now"; pin them so the bytes are stable
+    pinned = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as source, \
+            zipfile.ZipFile(pinned, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            member = zipfile.ZipInfo(info.filename, date_time=FIXED_TIMESTAMP.timetuple()[:6])
+            member.compress_type = zipfile.ZIP_DEFLATED
+            target.writestr(member, source.read(info.filename))
+    return pinned.getvalue()
+
+
+def generate_corpus(count: int, seed: int = 0, formats: Tuple[str, ...] = ("pdf", "docx"),
+                    max_roles: int = 12) -> List[Tuple[str, bytes]]:
+    """Generate (filename, content) pairs, alternating formats and growing in length"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        extension = formats[index % len(formats)]
+        lines = build_resume_lines(rng, roles=1 + index % max_roles)
+        content = make_pdf(lines) if extension == "pdf" else make_docx(lines)
+        corpus.append((f"resume_{index:03d}.{extension}", content))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="directory to write the files to")
+    args = parser.parse_args()
+    
+    os.makedirs(args.out, exist_ok=True)
+    for filename, content in generate_corpus(args.count, args.seed):
+        with open(os.path.join(args.out, filename), "wb") as handle:
+            handle.write(content)
+    print(f"Wrote {args.count} resumes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
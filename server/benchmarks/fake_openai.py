@@ -0,0 +1,217 @@
+"""
+Deterministic fake OpenAI-compatible server for local testing.
+
+Serves /v1/chat/completions (streaming and non-streaming) with a canned
+resume analysis so the API can be exercised without network access:
+
+    python -m benchmarks.fake_openai --port 9000
+    OPENAI_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+FAKE_OPENAI_LATENCY sets the delay before the first token (seconds) and
+FAKE_OPENAI_TOKENS_PER_SECOND the streaming rate (0 means unthrottled).
+FAKE_OPENAI_RATE_LIMIT_EVERY=N answers every Nth request with a 429 and
+FAKE_OPENAI_RETRY_AFTER seconds in Retry-After, to exercise backoff.
+FAKE_OPENAI_ERROR_RATE answers that share of requests with a 500 (endpoint
+failover) and FAKE_OPENAI_INVALID_MODELS lists models whose JSON requests get
+unparseable output (escalation to a larger model). FAKE_OPENAI_STREAM_ABORT_AFTER=N
+drops streaming responses after N tokens, to exercise mid-stream failures.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+CANNED_ANALYSIS = """## Resume Analysis
+
+**Overall Score: 7/10**
+
+### ATS Compatibility
+- Strong use of standard section headings that parse well in most ATS platforms
+- Contact details are clearly formatted and easy to extract
+
+### Content Quality
+- Good use of action verbs across the experience section
+- You should quantify achievements with concrete metrics wherever possible
+
+### Keywords
+- Missing keywords: add Kubernetes, Terraform and observability tooling
+- Consider adding the exact job title used in the posting
+
+### Specific Improvements
+- Improve the summary so it leads with your strongest, most relevant result
+- Update the skills section to group tools by category
+- Recommend removing outdated technologies that no longer add value
+"""
+
+# Returned when the request asks for response_format={"type": "json_object"}
+CANNED_JSON_ANALYSIS = json.dumps({
+    "ats_score": 7,
+    "summary": "A well-structured resume with strong technical depth that undersells measurable impact.",
+    "key_recommendations": [
+        "Quantify achievements with concrete metrics wherever possible",
+        "Lead the summary with your strongest, most relevant result"
+    ],
+    "missing_keywords": ["Kubernetes", "Terraform", "Observability"],
+    "strengths": [
+        "Standard section headings that parse well in ATS platforms",
+        "Good use of action verbs across the experience section"
+    ],
+    "improvements": [
+        "Group tools in the skills section by category",
+        "Remove outdated technologies that no longer add value"
+    ]
+}, indent=2)
+
+# Returned for JSON requests whose system prompt mentions LinkedIn (combined LinkedIn mode)
+CANNED_LINKEDIN_JSON = json.dumps({
+    "headline": "Senior Python Engineer | FastAPI & AWS | Building Reliable, High-Traffic APIs",
+    "summary": (
+        "I build backend systems that stay fast and reliable as products grow. Over the last eight years "
+        "I have designed payment APIs, event-driven pipelines and the CI/CD tooling that keeps teams shipping.\n\n"
+        "I care about measurable outcomes: lower latency, fewer incidents and happier on-call engineers.\n\n"
+        "Let's connect if you are scaling a platform and need someone who enjoys the hard parts."
+    ),
+    "skills": [
+        "Python", "FastAPI", "PostgreSQL", "AWS", "Docker", "Kubernetes", "Terraform", "Kafka",
+        "REST APIs", "System Design", "CI/CD", "Observability", "Mentoring", "Technical Leadership"
+    ],
+    "recommendations": [
+        "Add a custom banner image that reflects your backend and cloud focus",
+        "Request recommendations from two recent managers highlighting measurable impact",
+        "Publish a short post each month about lessons learned scaling APIs",
+        "Add featured links to talks, open-source work or architecture write-ups",
+        "Turn on Open to Work for recruiters only with your target titles listed"
+    ]
+}, indent=2)
+
+app = FastAPI(title="Fake OpenAI")
+
+_request_count = 0
+
+
+def _split_tokens(text: str):
+    """Split text into word-sized chunks that keep their trailing whitespace"""
+    token = ""
+    for char in text:
+        token += char
+        if char.isspace():
+            yield token
+            token = ""
+    if token:
+        yield token
+
+
+def _usage(messages, completion: str) -> dict:
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    completion_tokens = len(completion) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    global _request_count
+    _request_count += 1
+    rate_limit_every = int(os.getenv("FAKE_OPENAI_RATE_LIMIT_EVERY", "0"))
+    if rate_limit_every and _request_count % rate_limit_every == 0:
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            headers={"Retry-After": os.getenv("FAKE_OPENAI_RETRY_AFTER", "0.2")}
+        )
+    
+    if random.random() < float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0")):
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Injected server error", "type": "server_error", "code": None}}
+        )
+    
+    body = await request.json()
+    model = body.get("model", "gpt-3.5-turbo")
+    messages = body.get("messages", [])
+    latency = float(os.getenv("FAKE_OPENAI_LATENCY", "0.2"))
+    tokens_per_second = float(os.getenv("FAKE_OPENAI_TOKENS_PER_SECOND", "200"))
+    response_format = body.get("response_format") or {}
+    content = CANNED_ANALYSIS
+    if response_format.get("type") == "json_object":
+        system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        content = CANNED_LINKEDIN_JSON if "LinkedIn" in system else CANNED_JSON_ANALYSIS
+        if model in os.getenv("FAKE_OPENAI_INVALID_MODELS", "").split(","):
+            content = "Sorry, I cannot produce JSON for this request."
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    
+    await asyncio.sleep(latency)
+    
+    if not body.get("stream"):
+        tokens = list(_split_tokens(content))
+        if tokens_per_second:
+            await asyncio.sleep(len(tokens) / tokens_per_second)
+        return JSONResponse(content={
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": _usage(messages, content)
+        })
+    
+    abort_after = int(os.getenv("FAKE_OPENAI_STREAM_ABORT_AFTER", "0"))
+    
+    async def event_stream():
+        for index, token in enumerate(_split_tokens(content)):
+            if abort_after and index == abort_after:
+                # Raising inside the body makes the server drop the connection mid-response
+                raise RuntimeError("Injected stream failure")
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if tokens_per_second:
+                await asyncio.sleep(1 / tokens_per_second)
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage_chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": _usage(messages, content)
+            }
+            yield f"data: {json.dumps(usage_chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the fake OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,180 @@
+"""
+End-to-end load test against a local fake OpenAI server.
+
+Each virtual user uploads a generated resume, analyzes it against a job
+description and requests LinkedIn suggestions, reusing the resume_id.
+Latency percentiles and RPS are reported per endpoint:
+
+    python -m benchmarks.load_test --users 20 --iterations 200 --llm-latency 0.3 --tokens-per-second 300
+
+By default the app runs in-process (so peak RSS covers the server); pass
+--url to drive an already running server that points at the fake backend.
+LLM response caching is disabled unless --cache is given, so every request
+exercises the full path.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List
+import httpx
+
+from .corpus import JOB_DESCRIPTIONS, generate_corpus
+from .report import add_baseline_arguments, check_baseline, peak_rss_mb, print_table, summarize
+
+
+async def wait_for_port(url: str, timeout: float = 15.0) -> None:
+    """Poll until an HTTP server answers at url"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+                await asyncio.sleep(0.1)
+
+
+def start_fake_openai(port: int, latency: float, tokens_per_second: float, **extra_env: str) -> subprocess.Popen:
+    """Run the fake OpenAI server in a child process so it does not share our CPU"""
+    env = dict(
+        os.environ,
+        FAKE_OPENAI_LATENCY=str(latency),
+        FAKE_OPENAI_TOKENS_PER_SECOND=str(tokens_per_second),
+        **extra_env
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(port)],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+@asynccontextmanager
+async def target_client(args):
+    """HTTP client for --url, otherwise an in-process client with the app lifespan running"""
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            yield client
+        return
+    
+    os.environ["OPENAI_API_KEY"] = "load-test"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}/v1"
+    if not args.cache:
+        os.environ["LLM_CACHE_BACKEND"] = "none"
+    from app.main import app
+    
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            yield client
+
+
+async def run_user(client: httpx.AsyncClient, corpus, counter, iterations: int,
+                   timings: Dict[str, List[float]], failures: Dict[str, int]) -> None:
+    """Run upload -> analyze -> linkedin flows until the shared iteration budget is spent"""
+    
+    async def timed(name: str, request):
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            failures[name] += 1
+            return None
+        if response.status_code >= 400:
+            failures[name] += 1
+            return None
+        timings[name].append(time.perf_counter() - started)
+        return response.json()
+    
+    while True:
+        index = next(counter)
+        if index >= iterations:
+            return
+        filename, content = corpus[index % len(corpus)]
+        flow_started = time.perf_counter()
+        
+        upload = await timed("/upload-resume", client.post("/upload-resume", files={"file": (filename, content)}))
+        if upload is None:
+            continue
+        payload = {"resume_id": upload["resume_id"]}
+        analysis = await timed("/analyze", client.post("/analyze", json={
+            **payload, "job_description": JOB_DESCRIPTIONS[index % len(JOB_DESCRIPTIONS)]
+        }))
+        linkedin = await timed("/linkedin", client.post("/linkedin", json=payload))
+        if analysis is not None and linkedin is not None:
+            timings["flow"].append(time.perf_counter() - flow_started)
+
+
+async def run(args) -> int:
+    fake = None
+    if not args.no_fake:
+        fake = start_fake_openai(args.fake_port, args.llm_latency, args.tokens_per_second)
+    try:
+        if fake is not None:
+            await wait_for_port(f"http://127.0.0.1:{args.fake_port}/docs")
+        corpus = generate_corpus(args.corpus_size, args.seed)
+        timings: Dict[str, List[float]] = defaultdict(list)
+        failures: Dict[str, int] = defaultdict(int)
+        counter = iter(range(sys.maxsize))
+        
+        async with target_client(args) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                run_user(client, corpus, counter, args.iterations, timings, failures)
+                for _ in range(args.users)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait()
+    
+    results = {name: summarize(samples, elapsed) for name, samples in timings.items()}
+    print(f"{args.iterations} flows, {args.users} users, {elapsed:.2f}s wall time")
+    print_table(results)
+    if failures:
+        print("failures: " + ", ".join(f"{name}={count}" for name, count in sorted(failures.items())))
+    rss = peak_rss_mb()
+    print(f"peak RSS: {rss:.1f} MiB" + (" (load generator only)" if args.url else ""))
+    
+    settings = {
+        "load": {
+            "users": args.users,
+            "iterations": args.iterations,
+            "llm_latency": args.llm_latency,
+            "tokens_per_second": args.tokens_per_second,
+            "cache": args.cache
+        },
+        "peak_rss_mb": rss,
+        "failures": dict(failures)
+    }
+    return check_baseline(args, results, settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=50, help="total upload/analyze/linkedin flows")
+    parser.add_argument("--corpus-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fake time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="fake token rate, 0 = unthrottled")
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--no-fake", action="store_true", help="do not start the fake OpenAI server")
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
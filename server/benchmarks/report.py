@@ -0,0 +1,112 @@
+"""
+Shared reporting helpers for the benchmark scripts: latency percentiles,
+peak RSS and baseline files used to catch regressions between runs.
+"""
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted sample list"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """Latency summary in milliseconds, plus throughput when the wall time is known"""
+    summary = {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+    if elapsed:
+        summary["rps"] = len(samples) / elapsed
+    return summary
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB everywhere else
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    """Print one row per benchmark"""
+    print(f"{'benchmark':<28} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'rps':>9}")
+    for name, summary in results.items():
+        rps = f"{summary['rps']:>9.1f}" if "rps" in summary else f"{'-':>9}"
+        print(
+            f"{name:<28} {summary['count']:>6} {summary['p50_ms']:>10.2f} "
+            f"{summary['p95_ms']:>10.2f} {summary['p99_ms']:>10.2f} {rps}"
+        )
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]], extra: Optional[dict] = None) -> None:
+    """Write results to a JSON baseline file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+        **(extra or {})
+    }
+    with open(path, "w") as handle:
+        json.dump(payload, handle, indent=2, sort_keys=True)
+    print(f"Saved baseline to {path}")
+
+
+def compare_baseline(path: str, results: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Return a message for every benchmark whose p95 regressed beyond the tolerance"""
+    with open(path) as handle:
+        baseline = json.load(handle)["results"]
+    
+    regressions = []
+    for name, summary in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("p95_ms"):
+            continue
+        ratio = summary["p95_ms"] / previous["p95_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: p95 {summary['p95_ms']:.2f}ms vs baseline {previous['p95_ms']:.2f}ms ({ratio:.2f}x)"
+            )
+        if previous.get("rps") and summary.get("rps") and summary["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {summary['rps']:.1f} rps vs baseline {previous['rps']:.1f} rps")
+    return regressions
+
+
+def check_baseline(args, results: Dict[str, Dict[str, float]], extra: Optional[dict] = None) -> int:
+    """Handle the --save-baseline/--baseline flags and return the process exit code"""
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, extra)
+    if args.baseline:
+        regressions = compare_baseline(args.baseline, results, args.tolerance)
+        if regressions:
+            print(f"Regressions against {args.baseline}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+def add_baseline_arguments(parser) -> None:
+    """Register the baseline flags shared by every benchmark script"""
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results to a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a result counts as a regression (default 0.25)")
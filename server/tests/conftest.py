@@ -0,0 +1,46 @@
+"""
+Shared fixtures. Tests talk to benchmarks/fake_openai.py on a local port, so
+they need no network access or API key:
+
+    cd server
+    python -m pytest
+"""
+import asyncio
+import socket
+import pytest
+
+from benchmarks.load_test import start_fake_openai, wait_for_port
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def start_fake():
+    """Start a fake OpenAI server with extra FAKE_OPENAI_* settings, returning its base URL"""
+    servers = []
+    
+    def start(**extra_env: str) -> str:
+        port = _free_port()
+        servers.append(start_fake_openai(port, latency=0.01, tokens_per_second=0, **extra_env))
+        asyncio.run(wait_for_port(f"http://127.0.0.1:{port}/docs"))
+        return f"http://127.0.0.1:{port}/v1"
+    
+    yield start
+    for server in servers:
+        server.terminate()
+        server.wait()
+
+
+@pytest.fixture(scope="session")
+def fake_openai(start_fake) -> str:
+    return start_fake()
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    """Every completion reaches the fake server"""
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "none")
@@ -0,0 +1,26 @@
+"""AIAnalyzer configuration"""
+import logging
+
+import openai
+
+from app.services import ai_analyzer as analyzer_module
+from app.services.ai_analyzer import AIAnalyzer
+
+
+def make_analyzer() -> AIAnalyzer:
+    return AIAnalyzer(client=openai.AsyncOpenAI(api_key="test", base_url="http://127.0.0.1:1/v1"))
+
+
+def test_incremental_mode_needs_a_cache(monkeypatch, caplog):
+    monkeypatch.setenv("ANALYSIS_INCREMENTAL", "true")
+    with caplog.at_level(logging.WARNING, logger=analyzer_module.__name__):
+        analyzer = make_analyzer()
+    
+    assert analyzer.incremental is False
+    assert "ANALYSIS_INCREMENTAL" in caplog.text
+
+
+def test_incremental_mode_with_memory_cache(monkeypatch):
+    monkeypatch.setenv("ANALYSIS_INCREMENTAL", "true")
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "memory")
+    assert make_analyzer().incremental is True
@@ -0,0 +1,109 @@
+"""LRU, SQLite and tiered caches: eviction, expiry and promotion"""
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import LRUCache, SQLiteCache, TieredCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A clock that only moves when told to, for both monotonic and wall time"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def tick(clock, seconds: float = 1.0) -> None:
+    clock[0] += seconds
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries(clock):
+    cache = LRUCache(max_entries=10, ttl=5)
+    cache.set("a", 1)
+    tick(clock, 4.9)
+    assert cache.get("a") == 1
+    tick(clock, 0.2)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_with_no_room_stores_nothing():
+    cache = LRUCache(max_entries=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_sqlite_evicts_least_recently_accessed(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", {"value": 1})
+    tick(clock)
+    cache.set("b", {"value": 2})
+    tick(clock)
+    assert cache.get("a") == {"value": 1}
+    tick(clock)
+    cache.set("c", {"value": 3})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1} and cache.get("c") == {"value": 3}
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_sqlite_expires_and_persists(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, ttl=10)
+    cache.set("short", "value")
+    cache.close()
+    
+    reopened = SQLiteCache(path, ttl=10)
+    assert reopened.get("short") == "value"
+    tick(clock, 11)
+    assert reopened.get("short") is None
+    assert len(reopened) == 0
+    reopened.close()
+
+
+def test_sqlite_namespaces_are_separate(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    parsed = SQLiteCache(path, namespace="parsed_text", max_entries=1)
+    llm = SQLiteCache(path, namespace="analysis", max_entries=1)
+    parsed.set("key", "text")
+    llm.set("key", "completion")
+    llm.set("other", "completion")
+    
+    assert parsed.get("key") == "text"
+    assert llm.get("key") is None
+    parsed.clear()
+    assert llm.get("other") == "completion"
+    parsed.close()
+    llm.close()
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    disk.set("a", "from disk")
+    cache = TieredCache(LRUCache(max_entries=4), disk)
+    
+    assert cache.get("a") == "from disk"
+    assert cache.get("a") == "from disk"
+    assert cache.get("missing") is None
+    assert cache.stats() == {
+        "hits": 2, "memory_hits": 1, "disk_hits": 1, "misses": 1, "memory_entries": 1, "disk_entries": 1
+    }
+    
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.close()
@@ -0,0 +1,139 @@
+"""Job queue backends: leases, recovery and waiting"""
+import asyncio
+import time
+
+from app.services.job_queue import (
+    JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, InMemoryJobBackend, JobQueue, SQLiteJobBackend
+)
+
+
+def make_job(job_id: str) -> dict:
+    now = time.time()
+    return {
+        "id": job_id, "kind": "echo", "status": JOB_QUEUED, "payload": {"value": job_id},
+        "result": None, "error": None, "created_at": now, "updated_at": now
+    }
+
+
+def test_expired_lease_is_recovered_by_another_worker(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    
+    async def scenario():
+        crashed = SQLiteJobBackend(path, poll_interval=0.02, lease=0.3)
+        survivor = SQLiteJobBackend(path, poll_interval=0.02, lease=0.3)
+        await crashed.put(make_job("a"))
+        claimed = await crashed.next()
+        assert claimed["id"] == "a" and claimed["status"] == JOB_RUNNING
+        # The worker dies without closing: its lease is no longer renewed
+        crashed._renewer.cancel()
+        
+        survivor.recover()
+        assert survivor.get("a")["status"] == JOB_RUNNING
+        
+        reclaimed = await asyncio.wait_for(survivor.next(), timeout=2)
+        assert reclaimed["id"] == "a" and reclaimed["status"] == JOB_RUNNING
+        survivor.close()
+        crashed._conn.close()
+    
+    asyncio.run(scenario())
+
+
+def test_renewed_lease_is_not_recovered(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    
+    async def scenario():
+        worker = SQLiteJobBackend(path, poll_interval=0.02, lease=0.3)
+        other = SQLiteJobBackend(path, poll_interval=0.02, lease=0.3)
+        await worker.put(make_job("a"))
+        await worker.next()
+        
+        # Three lease periods pass while the worker keeps renewing
+        await asyncio.sleep(0.9)
+        other.recover()
+        assert other.get("a")["status"] == JOB_RUNNING
+        assert other.pending_count() == 0
+        
+        worker.close()
+        other.close()
+    
+    asyncio.run(scenario())
+
+
+def test_close_requeues_only_this_workers_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    
+    async def scenario():
+        first = SQLiteJobBackend(path, poll_interval=0.02, lease=30)
+        second = SQLiteJobBackend(path, poll_interval=0.02, lease=30)
+        await first.put(make_job("a"))
+        await first.put(make_job("b"))
+        assert (await first.next())["id"] == "a"
+        assert (await second.next())["id"] == "b"
+        
+        first.close()
+        assert second.get("a")["status"] == JOB_QUEUED
+        assert second.get("b")["status"] == JOB_RUNNING
+        second.close()
+    
+    asyncio.run(scenario())
+
+
+def test_interrupted_job_finishes_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    
+    async def scenario():
+        started = asyncio.Event()
+        
+        async def stuck(payload):
+            started.set()
+            await asyncio.sleep(60)
+        
+        queue = JobQueue(SQLiteJobBackend(path, poll_interval=0.02), workers=1)
+        queue.register("echo", stuck)
+        await queue.start()
+        job = await queue.submit("echo", {"value": 1})
+        await asyncio.wait_for(started.wait(), timeout=2)
+        await queue.stop()
+        
+        async def echo(payload):
+            return payload
+        
+        restarted = JobQueue(SQLiteJobBackend(path, poll_interval=0.02), workers=1)
+        restarted.register("echo", echo)
+        await restarted.start()
+        finished = await restarted.wait(job["job_id"], timeout=5)
+        await restarted.stop()
+        return finished
+    
+    finished = asyncio.run(scenario())
+    assert finished["status"] == JOB_SUCCEEDED
+    assert finished["result"] == {"value": 1}
+
+
+def test_wait_times_out_without_leaking_waiters():
+    async def scenario():
+        release = asyncio.Event()
+        
+        async def slow(payload):
+            await release.wait()
+            return {"done": True}
+        
+        queue = JobQueue(InMemoryJobBackend(), workers=1)
+        queue.register("slow", slow)
+        await queue.start()
+        job = await queue.submit("slow", {})
+        
+        pending = await queue.wait(job["job_id"], timeout=0.05)
+        assert pending["status"] == JOB_RUNNING
+        assert queue._waiters == {}
+        
+        waiting = asyncio.ensure_future(queue.wait(job["job_id"], timeout=5))
+        await asyncio.sleep(0.05)
+        release.set()
+        finished = await waiting
+        await queue.stop()
+        return finished, queue._waiters
+    
+    finished, waiters = asyncio.run(scenario())
+    assert finished["status"] == JOB_SUCCEEDED
+    assert waiters == {}
@@ -0,0 +1,61 @@
+"""TokenBucket admission timing and LLMScheduler budget accounting, with a controllable clock"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services import llm_scheduler as scheduler_module
+from app.services.llm_scheduler import LLMScheduler, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize("rate,retry_after", [(60, 2.0), (600, 0.5), (6, 30.0)])
+def test_drain_resumes_admission_at_retry_after(clock, rate, retry_after):
+    bucket = TokenBucket(rate)
+    bucket.drain(retry_after)
+    
+    assert bucket.time_until(1) == pytest.approx(retry_after)
+    clock[0] += retry_after * 0.99
+    assert bucket.time_until(1) > 0
+    clock[0] += retry_after * 0.01
+    assert bucket.time_until(1) == pytest.approx(0, abs=1e-9)
+
+
+def test_drain_keeps_a_deeper_deficit(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    bucket.consume(60)
+    
+    bucket.drain(1.0)
+    assert bucket.time_until(1) == pytest.approx(61.0)
+
+
+def test_failed_attempts_return_their_reservation(clock, monkeypatch):
+    monkeypatch.setenv("LLM_RPM_LIMIT", "60")
+    monkeypatch.setenv("LLM_TPM_LIMIT", "10000")
+    monkeypatch.setenv("LLM_BACKOFF_BASE", "0")
+    scheduler = LLMScheduler()
+    attempts = []
+    
+    async def create(**kwargs):
+        attempts.append(kwargs["model"])
+        raise openai.APIConnectionError(request=httpx.Request("POST", "http://fake/v1"))
+    
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    messages = [{"role": "user", "content": "Review this resume " * 100}]
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(scheduler.create(client, max_retries=3, model="m", messages=messages, max_tokens=2000))
+    
+    limits = scheduler._get_limits("m")
+    assert len(attempts) == 4
+    assert limits.tokens.tokens == pytest.approx(10000)
+    assert limits.requests.tokens == pytest.approx(60)
+    assert scheduler.stats()["failed"] == 1
@@ -0,0 +1,109 @@
+"""ETag revalidation and response compression"""
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.middleware import CompressionMiddleware, ConditionalGetMiddleware, choose_encoding
+from app.responses import FastJSONResponse
+
+PAYLOAD = {"items": [{"id": index, "text": "resume feedback " * 4} for index in range(50)]}
+
+
+def make_app() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    # Same order as app.main: the ETag is computed on the uncompressed body
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+    
+    @app.post("/large")
+    async def large_post():
+        return PAYLOAD
+    
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+    
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for index in range(3):
+                yield ("x" * 1024 + "\n").encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    return app
+
+
+def request(method: str, path: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    async def send():
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, headers=headers)
+    
+    return asyncio.run(send())
+
+
+def test_matching_if_none_match_returns_304():
+    first = request("GET", "/large", {"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    
+    revalidated = request("GET", "/large", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert "content-type" not in revalidated.headers
+
+
+def test_if_none_match_lists_and_strong_tags():
+    etag = request("GET", "/large").headers["etag"]
+    opaque = etag[2:]
+    
+    assert request("GET", "/large", {"If-None-Match": f'"other", {opaque}'}).status_code == 304
+    assert request("GET", "/large", {"If-None-Match": "*"}).status_code == 304
+    changed = request("GET", "/large", {"If-None-Match": '"other"'})
+    assert changed.status_code == 200
+    assert changed.json() == PAYLOAD
+
+
+def test_etag_does_not_depend_on_encoding():
+    plain = request("GET", "/large", {"Accept-Encoding": "identity"})
+    compressed = request("GET", "/large", {"Accept-Encoding": "gzip"})
+    assert plain.headers["etag"] == compressed.headers["etag"]
+
+
+def test_only_get_responses_are_tagged():
+    response = request("POST", "/large", {"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_large_json_is_gzipped():
+    response = request("GET", "/large", {"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    # httpx decodes the body; the wire size is what was compressed
+    assert response.num_bytes_downloaded == int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+
+
+def test_small_and_streamed_bodies_are_not_compressed():
+    small = request("GET", "/small", {"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    
+    stream = request("GET", "/stream", {"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers
+    assert len(stream.content) == 3 * 1025
+
+
+def test_choose_encoding_honours_q_values():
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("*;q=0.5") is not None
+    assert choose_encoding("") is None
+    assert choose_encoding("gzip, identity;q=0.1") == "gzip"
@@ -0,0 +1,123 @@
+"""ModelRouter settings, escalation and endpoint failover, against stub clients"""
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services import model_router as router_module
+from app.services.model_router import TIER_LARGE, TIER_SMALL, ModelRouter, TaskRoute
+
+
+class StubClient:
+    """Answers chat.completions.create with a fixed reply, or fails with a connection error"""
+    
+    def __init__(self, base_url: str, replies=None, fail: bool = False):
+        self.base_url = base_url
+        self.replies = replies or {}
+        self.fail = fail
+        self.models = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+    
+    async def create(self, model: str, **kwargs):
+        self.models.append(model)
+        if self.fail:
+            raise openai.APIConnectionError(request=httpx.Request("POST", self.base_url))
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        message = SimpleNamespace(content=self.replies.get(model, "ok"))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def router_env(monkeypatch):
+    monkeypatch.setenv("LLM_SMALL_MODEL", "small-model")
+    monkeypatch.setenv("LLM_LARGE_MODEL", "large-model")
+    monkeypatch.setenv("LLM_ROUTER_EXPLORE", "0")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    for name in ("LLM_TASK_ROUTES", "LLM_MODEL_PRICES", "LLM_ENDPOINTS"):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def use_clients(monkeypatch, clients):
+    """Route every endpoint's client lookup to the stub for its base URL"""
+    monkeypatch.setattr(router_module.openai_clients, "get", lambda base_url, api_key=None: clients[base_url])
+    monkeypatch.setattr(router_module.llm_scheduler, "max_retries", 0)
+
+
+def test_task_routes_override_defaults(router_env):
+    router_env.setenv("LLM_TASK_ROUTES", "headline=large, summary=small:600, custom=:300")
+    router = ModelRouter()
+    
+    assert router.route("headline") == TaskRoute(TIER_LARGE, 500)
+    assert router.route("summary") == TaskRoute(TIER_SMALL, 600)
+    assert router.route("custom") == TaskRoute(TIER_LARGE, 300)
+    assert router.model_for("summary") == "small-model"
+
+
+def test_malformed_settings_are_skipped(router_env, caplog):
+    router_env.setenv("LLM_TASK_ROUTES", "headline=medium,summary=small:lots,skills=small:0,analysis=small:900")
+    router_env.setenv("LLM_MODEL_PRICES", "cheap=free,custom=1:2")
+    with caplog.at_level(logging.WARNING, logger=router_module.__name__):
+        router = ModelRouter()
+    
+    assert router.route("headline") == router_module.DEFAULT_ROUTES["headline"]
+    assert router.route("summary") == router_module.DEFAULT_ROUTES["summary"]
+    assert router.route("skills") == router_module.DEFAULT_ROUTES["skills"]
+    assert router.route("analysis") == TaskRoute(TIER_SMALL, 900)
+    assert "cheap" not in router.prices
+    assert router.prices["custom"] == (1.0, 2.0)
+    assert len(caplog.records) == 4
+
+
+def test_escalates_after_failed_validation(router_env):
+    router_env.setenv("LLM_ENDPOINTS", "a=http://a/v1")
+    client = StubClient("http://a/v1", replies={"small-model": "too long " * 50, "large-model": "short"})
+    use_clients(router_env, {"http://a/v1": client})
+    router = ModelRouter()
+    
+    response = asyncio.run(router.create("headline", validate=lambda text: len(text) < 100, messages=[]))
+    
+    assert response.choices[0].message.content == "short"
+    assert client.models == ["small-model", "large-model"]
+    assert router.stats()["escalations"] == 1
+
+
+def test_fails_over_on_retryable_error(router_env):
+    router_env.setenv("LLM_ENDPOINTS", "a=http://a/v1,b=http://b/v1")
+    down, up = StubClient("http://a/v1", fail=True), StubClient("http://b/v1")
+    use_clients(router_env, {"http://a/v1": down, "http://b/v1": up})
+    router = ModelRouter()
+    
+    response = asyncio.run(router.create("analysis", messages=[]))
+    
+    assert response.choices[0].message.content == "ok"
+    assert down.models == ["large-model"] and up.models == ["large-model"]
+    stats = router.stats()
+    assert stats["failovers"] == 1
+    assert stats["a_failures"] == 1 and stats["a_available"] == 1
+
+
+def test_cooldown_after_failure_threshold(router_env):
+    router_env.setenv("LLM_ENDPOINTS", "a=http://a/v1,b=http://b/v1")
+    router_env.setenv("LLM_ENDPOINT_FAILURE_THRESHOLD", "2")
+    router_env.setenv("LLM_ENDPOINT_COOLDOWN", "60")
+    down, up = StubClient("http://a/v1", fail=True), StubClient("http://b/v1")
+    use_clients(router_env, {"http://a/v1": down, "http://b/v1": up})
+    router = ModelRouter()
+    # Keep the failing endpoint ranked first until it cools down
+    router.endpoints[1].latency = 1.0
+    
+    async def calls(count: int):
+        for _ in range(count):
+            await router.create("analysis", messages=[])
+    
+    asyncio.run(calls(2))
+    assert len(down.models) == 2
+    assert router.stats()["a_available"] == 0
+    
+    asyncio.run(calls(3))
+    assert len(down.models) == 2
+    assert len(up.models) == 5
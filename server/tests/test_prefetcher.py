@@ -0,0 +1,51 @@
+"""ResultPrefetcher caps and attaching to prefetched results"""
+import asyncio
+
+from app.services.prefetcher import ResultPrefetcher
+
+
+def make_prefetcher(monkeypatch, release: asyncio.Event, **env: str) -> ResultPrefetcher:
+    monkeypatch.setenv("PREFETCH_ENABLED", "true")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    
+    async def runner(content: str):
+        await release.wait()
+        return {"content": content}
+    
+    return ResultPrefetcher({"analyze": runner, "linkedin": runner})
+
+
+def test_per_client_cap_leaves_room_for_other_clients(monkeypatch):
+    async def scenario():
+        release = asyncio.Event()
+        prefetcher = make_prefetcher(monkeypatch, release, PREFETCH_MAX_PER_CLIENT="2", PREFETCH_MAX_TOTAL="8")
+        
+        assert prefetcher.start("r1", "first", client="10.0.0.1") == ["analyze", "linkedin"]
+        assert prefetcher.start("r2", "second", client="10.0.0.1") == []
+        assert prefetcher.start("r3", "third", client="10.0.0.2") == ["analyze", "linkedin"]
+        assert prefetcher.stats()["skipped"] == 2
+        
+        release.set()
+        assert await prefetcher.take("r1", "analyze") == {"content": "first"}
+        # Finished prefetches no longer count against the client
+        assert prefetcher.start("r4", "fourth", client="10.0.0.1") == ["analyze", "linkedin"]
+        prefetcher.close()
+    
+    asyncio.run(scenario())
+
+
+def test_total_cap_applies_across_clients(monkeypatch):
+    async def scenario():
+        release = asyncio.Event()
+        prefetcher = make_prefetcher(monkeypatch, release, PREFETCH_MAX_PER_CLIENT="0", PREFETCH_MAX_TOTAL="3")
+        
+        assert prefetcher.start("r1", "first", client="a") == ["analyze", "linkedin"]
+        assert prefetcher.start("r2", "second", client="b") == ["analyze"]
+        assert await prefetcher.take("r2", "linkedin") is None
+        
+        prefetcher.cancel("r1")
+        assert prefetcher.stats()["cancelled"] == 2
+        prefetcher.close()
+    
+    asyncio.run(scenario())
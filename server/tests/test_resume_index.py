@@ -0,0 +1,81 @@
+"""ResumeIndex ranking and the /index/search endpoint"""
+import asyncio
+from typing import Dict
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.resume_index import ResumeIndex
+
+
+def search(body: Dict) -> httpx.Response:
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            return await http.post("/index/search", json=body)
+    
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("body", [
+    {"job_description": "Python", "top_k": "ten"},
+    {"job_description": "Python", "top_k": None},
+    {"job_description": "Python", "top_k": 2.5},
+    {"job_description": "Python", "analyze_top": [1]},
+    {"job_description": 42},
+    {}
+])
+def test_search_rejects_malformed_input(body):
+    response = search(body)
+    assert response.status_code == 400
+
+
+def test_search_accepts_numeric_strings():
+    response = search({"job_description": "Python backend engineer", "top_k": "5", "analyze_top": "0"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+
+
+def make_index(monkeypatch, max_documents: int = 100) -> ResumeIndex:
+    monkeypatch.setenv("RESUME_INDEX_MAX", str(max_documents))
+    return ResumeIndex()
+
+
+def test_ranks_matching_resumes_first(monkeypatch):
+    index = make_index(monkeypatch)
+    index.add("python", "Backend engineer. Python, Django, PostgreSQL, Docker and AWS.", "python.pdf")
+    index.add("design", "Product designer. Figma, user research and prototyping.", "design.pdf")
+    index.add("java", "Java developer with Spring and Kubernetes experience.", "java.pdf")
+    
+    results = index.search("Senior Python engineer with Django and AWS", top_k=2)
+    assert [result["resume_id"] for result in results] == ["python"]
+    assert {"python", "django", "aws"} <= set(results[0]["matched_keywords"])
+    assert results[0]["filename"] == "python.pdf"
+
+
+def test_remove_and_reindex_keep_vocabulary_in_step(monkeypatch):
+    index = make_index(monkeypatch)
+    index.add("a", "Python Django")
+    index.add("b", "Python Kubernetes")
+    only_b = make_index(monkeypatch)
+    only_b.add("b", "Python Kubernetes")
+    
+    assert index.remove("a") is True
+    assert index.remove("a") is False
+    assert "a" not in index
+    assert index.stats() == only_b.stats()
+    assert index.search("Django developer") == []
+    
+    index.add("b", "Figma prototyping")
+    assert index.search("Python") == []
+    assert [result["resume_id"] for result in index.search("Figma")] == ["b"]
+
+
+def test_evicts_oldest_resume_at_capacity(monkeypatch):
+    index = make_index(monkeypatch, max_documents=2)
+    for resume_id in ("first", "second", "third"):
+        index.add(resume_id, "Python engineer")
+    
+    assert len(index) == 2
+    assert "first" not in index
+    assert {result["resume_id"] for result in index.search("Python")} == {"second", "third"}
@@ -0,0 +1,90 @@
+"""ResumeParser: page-range extraction, the character budget and uploads"""
+import asyncio
+import random
+import tempfile
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.services import resume_parser as parser_module
+from app.services.resume_parser import ResumeParser, UploadTooLargeError, _extract_pdf_text
+from benchmarks.corpus import build_resume_lines, make_pdf
+
+LONG_PDF = make_pdf(build_resume_lines(random.Random(1), 10) * 2, lines_per_page=12)
+
+
+def make_parser(monkeypatch, **env: str) -> ResumeParser:
+    monkeypatch.setenv("PARSE_CACHE_SIZE", "0")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return ResumeParser()
+
+
+@pytest.mark.parametrize("executor", ["thread", "inline"])
+@pytest.mark.parametrize("max_chars", ["0", "3000"])
+def test_page_ranges_match_a_single_pass(monkeypatch, executor, max_chars):
+    parser = make_parser(monkeypatch, PARSER_EXECUTOR=executor, PDF_PAGES_PER_TASK="3", PDF_MAX_CHARS=max_chars)
+    text = asyncio.run(parser.parse_bytes(LONG_PDF, "long.pdf"))
+    parser.shutdown()
+    
+    assert text == _extract_pdf_text(LONG_PDF, parser.pdf_max_pages, parser.pdf_max_chars)
+    if max_chars != "0":
+        assert len(text) == int(max_chars)
+
+
+def test_character_budget_cancels_later_ranges(monkeypatch):
+    parser = make_parser(
+        monkeypatch, PARSER_EXECUTOR="thread", PARSER_MAX_WORKERS="1", PDF_PAGES_PER_TASK="3", PDF_MAX_CHARS="3000"
+    )
+    ranges = []
+    extract = parser_module._extract_pdf_pages
+    
+    def recording(content, start, stop, *args):
+        ranges.append((start, stop))
+        return extract(content, start, stop, *args)
+    
+    monkeypatch.setattr(parser_module, "_extract_pdf_pages", recording)
+    
+    async def parse():
+        text = await parser.parse_bytes(LONG_PDF, "long.pdf")
+        # Let cancelled ranges settle before counting
+        await asyncio.sleep(0.05)
+        return text
+    
+    asyncio.run(parse())
+    parser.shutdown()
+    # The first range runs through _extract_pdf_range; one more fills the budget
+    assert len(ranges) <= 2
+
+
+def test_running_headers_are_kept_once_without_page_markers(monkeypatch):
+    lines = build_resume_lines(random.Random(2), 12)
+    pages = [["Jane Doe - Resume"] + lines[start:start + 15] for start in range(0, len(lines), 15)]
+    pdf = make_pdf([line for page in pages for line in page], lines_per_page=16)
+    
+    text = asyncio.run(make_parser(monkeypatch).parse_bytes(pdf, "resume.pdf"))
+    assert len(pages) > 1
+    assert text.count("Jane Doe - Resume") == 1
+    assert "\f" not in text
+
+
+@pytest.mark.parametrize("threshold", ["100", "100000000"])
+def test_upload_is_parsed_from_the_spooled_file(monkeypatch, threshold):
+    parser = make_parser(monkeypatch, PARSER_SPOOL_THRESHOLD=threshold)
+    spooled = tempfile.SpooledTemporaryFile(max_size=64)
+    spooled.write(LONG_PDF)
+    spooled.seek(0)
+    
+    text = asyncio.run(parser.parse_resume(UploadFile(spooled, filename="long.pdf")))
+    assert text == asyncio.run(make_parser(monkeypatch).parse_bytes(LONG_PDF, "long.pdf"))
+    assert not spooled.closed
+
+
+def test_oversized_upload_is_rejected_while_reading(monkeypatch):
+    parser = make_parser(monkeypatch, MAX_FILE_SIZE="1000")
+    spooled = tempfile.SpooledTemporaryFile()
+    spooled.write(LONG_PDF)
+    spooled.seek(0)
+    
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(parser.parse_resume(UploadFile(spooled, filename="long.pdf")))
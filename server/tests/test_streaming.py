@@ -0,0 +1,98 @@
+import asyncio
+import json
+from typing import Dict, List
+import httpx
+import openai
+
+from app.main import app, services
+from app.services.ai_analyzer import AIAnalyzer
+from benchmarks.fake_openai import CANNED_ANALYSIS
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer with eight years of Python experience.
+
+Experience
+Senior Engineer, Acme 2019 - 2024
+- Built payment APIs serving 2M requests a day
+"""
+
+
+def stream_events(base_url: str) -> List[Dict]:
+    """Run AIAnalyzer.stream_analysis against base_url and collect its events"""
+    
+    async def collect():
+        client = openai.AsyncOpenAI(api_key="test", base_url=base_url, max_retries=0)
+        try:
+            analyzer = AIAnalyzer(client=client)
+            return [event async for event in analyzer.stream_analysis(RESUME, "Python backend engineer")]
+        finally:
+            await client.close()
+    
+    return asyncio.run(collect())
+
+
+def parse_sse(body: str) -> List[Dict]:
+    """Split a text/event-stream body into {"event", "data"} dicts"""
+    events = []
+    for block in filter(None, body.split("\n\n")):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({"event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+def test_stream_emits_ats_then_tokens_then_result(fake_openai):
+    events = stream_events(fake_openai)
+    names = [event["event"] for event in events]
+    
+    assert names[0] == "ats"
+    assert names[-1] == "result"
+    assert set(names[1:-1]) == {"token"}
+    assert len(names) > 3
+    
+    streamed = "".join(event["data"]["content"] for event in events[1:-1])
+    assert streamed == CANNED_ANALYSIS
+    result = events[-1]["data"]
+    assert result["raw_analysis"] == CANNED_ANALYSIS
+    assert result["local_ats"] == events[0]["data"]
+    assert 1 <= result["ats_score"] <= 10
+
+
+def test_stream_failure_ends_with_error_event(start_fake):
+    events = stream_events(start_fake(FAKE_OPENAI_STREAM_ABORT_AFTER="5"))
+    names = [event["event"] for event in events]
+    
+    assert names[0] == "ats"
+    assert names[-1] == "error"
+    assert "result" not in names
+    # Tokens sent before the failure are still delivered, in order
+    assert names[1:-1] == ["token"] * 5
+    assert events[-1]["data"]["detail"].startswith("Error analyzing resume")
+
+
+def test_sse_endpoint_streams_events_in_order(fake_openai, monkeypatch):
+    
+    async def request():
+        client = openai.AsyncOpenAI(api_key="test", base_url=fake_openai, max_retries=0)
+        monkeypatch.setitem(services.__dict__, "ai_analyzer", AIAnalyzer(client=client))
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await http.post("/analyze/stream", json={"resume_content": RESUME})
+        finally:
+            await client.close()
+    
+    response = asyncio.run(request())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    # Event streams must reach the client unbuffered and uncompressed
+    assert "content-encoding" not in response.headers
+    
+    events = parse_sse(response.text)
+    names = [event["event"] for event in events]
+    assert names[0] == "ats"
+    assert names[-1] == "result"
+    assert set(names[1:-1]) == {"token"}
+    assert "".join(event["data"]["content"] for event in events[1:-1]) == CANNED_ANALYSIS